@@ -0,0 +1,4 @@
+from .image_derivatives import image_processor, InvalidImage, DERIVATIVE_SIZES
+from .upload_store import UploadIndex, ContentAddressedStaticFiles
+from .streaming_upload import receive_upload, StreamedUpload
+from .upstream_proxy import proxy_request
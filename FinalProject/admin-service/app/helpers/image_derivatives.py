@@ -0,0 +1,144 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from fastapi import HTTPException
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Longest edge in pixels for each derivative; images are scaled down to fit, never up
+DERIVATIVE_SIZES = {"thumb": 160, "card": 480, "detail": 1200}
+# Every size is written in each format; the storefront can prefer WebP and fall back to JPEG
+DERIVATIVE_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+# Uploads whose header declares more pixels than this are rejected before decoding (decompression bombs)
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(40_000_000)))
+
+# Resizing is CPU-bound and holds the GIL, so it runs in worker processes, not threads
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(min(2, os.cpu_count() or 1))))
+# Images allowed to wait for a free worker before further uploads get a 503
+IMAGE_MAX_QUEUE = int(os.getenv("IMAGE_MAX_QUEUE", "8"))
+
+
+class InvalidImage(Exception):
+  pass
+
+
+# Flattens transparency onto white for JPEG, which has no alpha channel
+def _to_rgb(image: Image.Image) -> Image.Image:
+  if image.mode != "RGBA":
+    return image
+  background = Image.new("RGB", image.size, (255, 255, 255))
+  background.paste(image, mask=image.getchannel("A"))
+  return background
+
+
+# Runs in a worker process: decodes source once and writes every size/format pair next to it
+# as <stem>-<size>.<ext>. Returns {size: {"width", "height", "webp": filename, "jpeg": filename}}
+def render_derivatives(source: str, out_dir: str, stem: str) -> dict:
+  try:
+    with Image.open(source) as original:
+      if original.width * original.height > IMAGE_MAX_PIXELS:
+        raise InvalidImage(f"Image too large: {original.width}x{original.height} pixels")
+      original.seek(0)  # first frame of animated GIF/WebP
+      image = ImageOps.exif_transpose(original)
+      image.load()
+  except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+    raise InvalidImage("File is not a readable image") from e
+
+  has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+  image = image.convert("RGBA" if has_alpha else "RGB")
+
+  derivatives = {}
+  # Largest first, each resized from the previous one: cheaper and visually identical at these ratios
+  for size, edge in sorted(DERIVATIVE_SIZES.items(), key=lambda item: -item[1]):
+    image = image.copy()
+    image.thumbnail((edge, edge), Image.LANCZOS)
+    entry = {"width": image.width, "height": image.height}
+    for extension, pil_format in DERIVATIVE_FORMATS.items():
+      filename = f"{stem}-{size}.{extension}"
+      target = _to_rgb(image) if pil_format == "JPEG" else image
+      options = {"quality": IMAGE_QUALITY, "optimize": True, "progressive": True} if pil_format == "JPEG" \
+        else {"quality": IMAGE_QUALITY, "method": 4}
+      target.save(os.path.join(out_dir, filename), pil_format, **options)
+      entry[extension] = filename
+    derivatives[size] = entry
+  return {size: derivatives[size] for size in DERIVATIVE_SIZES}
+
+
+# Runs render_derivatives on a bounded ProcessPoolExecutor so resizing never blocks the event loop
+# Admission is capped at workers + max_queue images in flight; beyond that uploads get a 503
+class ImageProcessor:
+  def __init__(self, workers: int, max_queue: int):
+    self.workers = workers
+    self.max_queue = max_queue
+    self._executor = None
+    self._lock = threading.Lock()
+    self._in_flight = 0
+    self.completed = 0
+    self.failed = 0
+    self.rejected = 0
+    self._render_seconds = 0.0
+
+  # Worker processes are started on first use, not at import time
+  def _get_executor(self) -> ProcessPoolExecutor:
+    if self._executor is None:
+      self._executor = ProcessPoolExecutor(max_workers=self.workers)
+    return self._executor
+
+  async def render(self, source: Path, out_dir: Path, stem: str) -> dict:
+    with self._lock:
+      if self._in_flight >= self.workers + self.max_queue:
+        self.rejected += 1
+        raise HTTPException(status_code=503, detail="Image processing busy, retry shortly", headers={"Retry-After": "2"})
+      self._in_flight += 1
+      executor = self._get_executor()
+
+    started = time.perf_counter()
+    try:
+      result = await asyncio.get_running_loop().run_in_executor(
+        executor, render_derivatives, str(source), str(out_dir), stem
+      )
+    except InvalidImage:
+      with self._lock:
+        self.failed += 1
+      raise
+    except BrokenProcessPool:
+      # A worker died (e.g. killed for memory); start a fresh pool for the next upload
+      with self._lock:
+        self.failed += 1
+        if self._executor is executor:
+          self._executor = None
+      raise HTTPException(status_code=503, detail="Image processing unavailable, retry shortly", headers={"Retry-After": "2"})
+    finally:
+      with self._lock:
+        self._in_flight -= 1
+    with self._lock:
+      self.completed += 1
+      self._render_seconds += time.perf_counter() - started
+    return result
+
+  def shutdown(self):
+    with self._lock:
+      executor, self._executor = self._executor, None
+    if executor is not None:
+      executor.shutdown(wait=True, cancel_futures=True)
+
+  # Snapshot of pool usage for the /debug/image-processor endpoint
+  def stats(self) -> dict:
+    with self._lock:
+      return {
+        "workers": self.workers,
+        "max_queue": self.max_queue,
+        "in_flight": self._in_flight,
+        "completed": self.completed,
+        "failed": self.failed,
+        "rejected": self.rejected,
+        "avg_render_ms": round(self._render_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+      }
+
+
+image_processor = ImageProcessor(IMAGE_WORKERS, IMAGE_MAX_QUEUE)
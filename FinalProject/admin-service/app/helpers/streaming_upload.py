@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import HTTPException, Request
+
+try:
+  from python_multipart import MultipartParser
+  from python_multipart.exceptions import MultipartParseError
+  from python_multipart.multipart import parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+  from multipart.multipart import MultipartParser, parse_options_header
+  from multipart.exceptions import MultipartParseError
+
+# Bytes gathered before each disk write; every write runs in a worker thread
+WRITE_BUFFER_SIZE = 256 * 1024
+# Room for boundaries and part headers when judging Content-Length against the file limit
+MULTIPART_OVERHEAD = 16 * 1024
+
+# Leading bytes of each accepted image format -> (stored extension, MIME type)
+IMAGE_SIGNATURES = [
+  (b"\xff\xd8\xff", ".jpg", "image/jpeg"),
+  (b"\x89PNG\r\n\x1a\n", ".png", "image/png"),
+  (b"GIF87a", ".gif", "image/gif"),
+  (b"GIF89a", ".gif", "image/gif"),
+]
+SNIFF_BYTES = 12
+
+
+# Returns (extension, MIME type) for the image format the bytes start with, or None
+def sniff_image_type(head: bytes):
+  if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+    return ".webp", "image/webp"
+  for signature, extension, mime_type in IMAGE_SIGNATURES:
+    if head.startswith(signature):
+      return extension, mime_type
+  return None
+
+
+@dataclass
+class StreamedUpload:
+  temp_path: Path
+  filename: str
+  extension: str
+  content_type: str
+  size: int
+  sha256: str
+
+
+# python-multipart callbacks that pick the bytes of one file field out of a multipart body
+# Data is queued during parser.write() and drained by receive_upload between chunks
+class _FilePartReceiver:
+  def __init__(self, field_name: str):
+    self.field_name = field_name
+    self.filename = None
+    self.active = False
+    self.done = False
+    self.chunks = []
+    self._headers = {}
+    self._header_name = b""
+    self._header_value = b""
+
+  def callbacks(self) -> dict:
+    return {
+      "on_part_begin": self.on_part_begin,
+      "on_header_field": self.on_header_field,
+      "on_header_value": self.on_header_value,
+      "on_header_end": self.on_header_end,
+      "on_headers_finished": self.on_headers_finished,
+      "on_part_data": self.on_part_data,
+      "on_part_end": self.on_part_end,
+    }
+
+  def on_part_begin(self):
+    self._headers = {}
+
+  def on_header_field(self, data, start, end):
+    self._header_name += data[start:end]
+
+  def on_header_value(self, data, start, end):
+    self._header_value += data[start:end]
+
+  def on_header_end(self):
+    self._headers[self._header_name.lower()] = self._header_value
+    self._header_name = b""
+    self._header_value = b""
+
+  def on_headers_finished(self):
+    _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+    name = options.get(b"name", b"").decode("utf-8", "replace")
+    if name == self.field_name and b"filename" in options and not self.done and self.filename is None:
+      self.filename = options[b"filename"].decode("utf-8", "replace")
+      self.active = True
+
+  def on_part_data(self, data, start, end):
+    if self.active:
+      self.chunks.append(data[start:end])
+
+  def on_part_end(self):
+    if self.active:
+      self.active = False
+      self.done = True
+
+
+def _too_large(max_size: int):
+  return HTTPException(status_code=413, detail=f"File too large. Maximum size: {max_size // (1024 * 1024)}MB")
+
+
+# Reads a multipart/form-data request body chunk by chunk and saves field_name's file to a
+# temporary dot-file in dest_dir, hashing it on the way. Rejects with 413 as soon as the declared
+# Content-Length or the bytes received pass max_size, and with 400 when the file name's extension
+# is not allowed or the first bytes are not a JPEG, PNG, GIF or WebP image. Disk writes run in a
+# worker thread so other requests keep being served while large uploads arrive.
+async def receive_upload(request: Request, field_name: str, dest_dir: Path, max_size: int,
+                         allowed_extensions: set) -> StreamedUpload:
+  content_length = request.headers.get("content-length", "")
+  if content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+    raise _too_large(max_size)
+
+  content_type, params = parse_options_header(request.headers.get("content-type", ""))
+  if content_type != b"multipart/form-data" or b"boundary" not in params:
+    raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+  receiver = _FilePartReceiver(field_name)
+  parser = MultipartParser(params[b"boundary"], receiver.callbacks())
+  temp_path = dest_dir / f".{uuid.uuid4()}.part"
+  handle = None
+  digest = hashlib.sha256()
+  pending = bytearray()
+  head = b""
+  detected = None
+  size = 0
+
+  try:
+    async for chunk in request.stream():
+      try:
+        parser.write(chunk)
+      except MultipartParseError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+
+      if receiver.filename is not None and handle is None:
+        extension = os.path.splitext(receiver.filename)[1].lower()
+        if extension not in allowed_extensions:
+          raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed types: {', '.join(sorted(allowed_extensions))}"
+          )
+        handle = await asyncio.to_thread(open, temp_path, "wb")
+
+      for data in receiver.chunks:
+        size += len(data)
+        if size > max_size:
+          raise _too_large(max_size)
+        if detected is None and len(head) < SNIFF_BYTES:
+          head += data[:SNIFF_BYTES - len(head)]
+          if len(head) >= SNIFF_BYTES:
+            detected = sniff_image_type(head)
+            if detected is None:
+              raise HTTPException(status_code=400, detail="File content is not a JPEG, PNG, GIF or WebP image")
+        digest.update(data)
+        pending += data
+      receiver.chunks.clear()
+
+      if len(pending) >= WRITE_BUFFER_SIZE:
+        await asyncio.to_thread(handle.write, bytes(pending))
+        pending.clear()
+      if receiver.done:
+        # The rest of the body holds nothing we use
+        break
+    else:
+      parser.finalize()
+
+    if handle is None:
+      raise HTTPException(status_code=400, detail=f"No file uploaded in the '{field_name}' field")
+    if detected is None:
+      # Files shorter than SNIFF_BYTES; none of the accepted formats is that small
+      detected = sniff_image_type(head)
+      if detected is None:
+        raise HTTPException(status_code=400, detail="File content is not a JPEG, PNG, GIF or WebP image")
+    if pending:
+      await asyncio.to_thread(handle.write, bytes(pending))
+    await asyncio.to_thread(handle.close)
+  except BaseException:
+    if handle is not None:
+      await asyncio.to_thread(handle.close)
+      await asyncio.to_thread(temp_path.unlink, True)
+    raise
+
+  extension, mime_type = detected
+  return StreamedUpload(temp_path, receiver.filename, extension, mime_type, size, digest.hexdigest())
@@ -0,0 +1,54 @@
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from fastapi.staticfiles import StaticFiles
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+# Content-addressed files: <sha256>.<ext>, plus derivatives <sha256>-<size>.<ext>
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}(-[a-z]+)?\.[a-z0-9]+$")
+# A file's name changes whenever its bytes do, so browsers and CDNs may keep it for a year unrevalidated
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+# sha256 -> upload metadata, persisted as JSON next to the files it describes
+# Lets a repeat upload be answered from the existing file without writing or resizing anything.
+# Every change rewrites the file through a temporary file and os.replace, so a crash never
+# leaves a half-written index behind.
+class UploadIndex:
+  def __init__(self, path: Path):
+    self.path = path
+    self._lock = threading.Lock()
+    try:
+      self._entries = json.loads(path.read_text())
+    except FileNotFoundError:
+      self._entries = {}
+
+  def get(self, sha256: str):
+    with self._lock:
+      return self._entries.get(sha256)
+
+  def put(self, sha256: str, entry: dict):
+    with self._lock:
+      self._entries[sha256] = entry
+      temp_path = self.path.with_name(self.path.name + ".tmp")
+      temp_path.write_text(json.dumps(self._entries, indent=1))
+      os.replace(temp_path, self.path)
+
+  def __len__(self):
+    with self._lock:
+      return len(self._entries)
+
+
+# StaticFiles that marks content-addressed uploads as immutable and never serves dot-files
+# (the upload index and in-progress .part files live in the same directory)
+class ContentAddressedStaticFiles(StaticFiles):
+  async def get_response(self, path, scope):
+    if any(part.startswith(".") for part in Path(path).parts):
+      raise StarletteHTTPException(status_code=404)
+    response = await super().get_response(path, scope)
+    if response.status_code in (200, 304) and CONTENT_ADDRESSED_NAME.match(Path(path).name):
+      response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
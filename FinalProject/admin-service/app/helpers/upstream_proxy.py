@@ -0,0 +1,51 @@
+import logging
+
+import httpx
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from common.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# Connection-level headers that describe the upstream hop, not the response being relayed
+HOP_BY_HOP_HEADERS = {
+  "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailer",
+  "transfer-encoding", "upgrade",
+}
+
+
+# Yields the upstream body bytes as received and always releases the connection, including when
+# the client disconnects mid-stream
+async def _relay_body(upstream: httpx.Response):
+  try:
+    async for chunk in upstream.aiter_raw():
+      yield chunk
+  finally:
+    await upstream.aclose()
+
+
+# Sends a request on the shared pooled client and relays the upstream response as it arrives:
+# status code, headers (ETag, Cache-Control, Content-Encoding, ...) and body bytes are passed
+# through untouched via aiter_raw, so nothing is decoded or re-encoded and memory stays flat
+# however large the body is. The upstream connection goes back to the pool once the body is sent.
+async def proxy_request(method: str, url: str, **kwargs) -> StreamingResponse:
+  client = get_http_client()
+  request = client.build_request(method, url, **kwargs)
+  try:
+    upstream = await client.send(request, stream=True)
+  except httpx.RequestError as e:
+    logger.error(f"Request error for {method} {url}: {e}")
+    raise HTTPException(status_code=500, detail=f"Failed to connect to product service: {str(e)}")
+
+  logger.info(f"{method} {url} -> {upstream.status_code}")
+  headers = {
+    name: value for name, value in upstream.headers.items() if name.lower() not in HOP_BY_HOP_HEADERS
+  }
+  return StreamingResponse(
+    _relay_body(upstream),
+    status_code=upstream.status_code,
+    headers=headers,
+    background=BackgroundTask(upstream.aclose),
+  )
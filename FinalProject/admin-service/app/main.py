@@ -1,17 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from .routers import products, uploads
+from .helpers import image_processor, ContentAddressedStaticFiles
+from common.http_client import http_client_lifespan
+from common.metrics import setup_metrics
 
-app = FastAPI(title="PhoneHub Admin Service", version="1.0.0")
+# Opens the shared HTTP client and stops the image worker processes at shutdown
+@asynccontextmanager
+async def lifespan(app):
+    async with http_client_lifespan(app):
+        try:
+            yield
+        finally:
+            image_processor.shutdown()
+
+app = FastAPI(title="PhoneHub Admin Service", version="1.0.0", lifespan=lifespan)
+
+# GET /metrics — Prometheus request and outbound HTTP metrics for this service
+setup_metrics(app)
 
 # Create static directories if they don't exist
 static_dir = Path("app/static")
 uploads_dir = static_dir / "uploads"
 uploads_dir.mkdir(parents=True, exist_ok=True)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# Mount static files; content-addressed uploads are served with immutable Cache-Control
+app.mount("/static", ContentAddressedStaticFiles(directory="app/static"), name="static")
 
 # Include routers
 app.include_router(products.router, prefix="/admin/products", tags=["Admin Products"])
@@ -28,3 +43,9 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"service": "admin-service", "status": "healthy"}
+
+# GET /debug/image-processor — Reports the image derivative process pool usage
+# Returns workers, in-flight renders, completed/failed/rejected counts and average render time
+@app.get("/debug/image-processor")
+def image_processor_stats():
+    return image_processor.stats()
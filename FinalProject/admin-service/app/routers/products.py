@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, Request, Query
 from pydantic import BaseModel
 from typing import Optional
 import httpx
 import logging
+import os
+from ..helpers import proxy_request
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -10,6 +12,14 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+PRODUCTS_SERVICE = "http://products-service:8005"
+# Bulk imports can run far longer than the shared client's default timeout
+PRODUCT_IMPORT_TIMEOUT = float(os.getenv("PRODUCT_IMPORT_TIMEOUT", "300"))
+
+# Every route relays the products-service response as a raw byte stream on the shared client:
+# status code, headers and body pass through without being parsed or re-encoded, so latency and
+# memory do not grow with the size of the catalog. Connection failures become a 500 error.
+
 
 class ProductCreate(BaseModel):
   category_id: int = 1
@@ -22,160 +32,64 @@ class ProductCreate(BaseModel):
 
 
 # GET / — Retrieves all products from the products-service
-# Makes HTTP request to products-service and returns the complete product list
-# Includes comprehensive error handling for connection and service failures
+# Forwards query parameters (filters, limit, cursor) and If-None-Match unchanged
+# Streams the product list back with its ETag, Cache-Control and X-Next-Cursor headers
 @router.get("/")
-async def get_products():
-  try:
-    logger.info("Fetching products from products-service")
-    async with httpx.AsyncClient() as client:
-      # Use the correct URL without trailing slash to avoid redirect
-      response = await client.get("http://products-service:8005/products")
-      logger.info(f"Products service response status: {response.status_code}")
-
-      if response.status_code == 200:
-        products = response.json()
-        logger.info(f"Retrieved {len(products)} products")
-        return products
-      else:
-        logger.error(f"Products service returned status {response.status_code}")
-        error_text = response.text
-        logger.error(f"Error response: {error_text}")
-        raise HTTPException(status_code=response.status_code, detail=f"Failed to fetch products: {error_text}")
-  except httpx.RequestError as e:
-    logger.error(f"Request error when connecting to products service: {e}")
-    raise HTTPException(status_code=500, detail=f"Failed to connect to product service: {str(e)}")
-  except Exception as e:
-    logger.error(f"Unexpected error in get_products: {e}")
-    raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+async def get_products(request: Request, if_none_match: Optional[str] = Header(None)):
+  headers = {"If-None-Match": if_none_match} if if_none_match else {}
+  # Use the correct URL without trailing slash to avoid redirect
+  return await proxy_request(
+    "GET", f"{PRODUCTS_SERVICE}/products", params=request.query_params, headers=headers
+  )
 
 
 # POST / — Creates a new product via the products-service
-# Accepts ProductCreate model, forwards request to products-service with JSON payload
-# Returns created product data on success or detailed error information on failure
+# Accepts ProductCreate model (which fills the admin defaults), forwards it as JSON
+# Streams back the created product with status 201, or the upstream error as-is
 @router.post("/")
 async def create_product(product: ProductCreate):
-  try:
-    logger.info(f"Creating product: {product.product_name}")
-    async with httpx.AsyncClient() as client:
-      response = await client.post(
-        "http://products-service:8005/products/",
-        json=product.dict(),
-        headers={"Content-Type": "application/json"}
-      )
-      logger.info(f"Create product response status: {response.status_code}")
-
-      if response.status_code == 201:
-        result = response.json()
-        logger.info(f"Product created successfully: {result.get('product_id')}")
-        return result
-      else:
-        error_text = response.text
-        logger.error(f"Failed to create product: {error_text}")
-        try:
-          error_json = response.json()
-          detail = error_json.get('detail', error_text)
-        except:
-          detail = error_text
-        raise HTTPException(status_code=response.status_code, detail=f"Failed to create product: {detail}")
-  except httpx.RequestError as e:
-    logger.error(f"Request error when creating product: {e}")
-    raise HTTPException(status_code=500, detail=f"Failed to connect to product service: {str(e)}")
-  except HTTPException:
-    raise
-  except Exception as e:
-    logger.error(f"Unexpected error in create_product: {e}")
-    raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+  logger.info(f"Creating product: {product.product_name}")
+  return await proxy_request("POST", f"{PRODUCTS_SERVICE}/products/", json=product.dict())
+
+
+# POST /import — Bulk-imports products from an NDJSON or CSV file via the products-service
+# Streams the request body to products-service /products/import as it arrives, with ?format= unchanged
+# Streams back the import report (counts, per-row errors, rows per second) or the upstream error
+@router.post("/import")
+async def import_products(request: Request, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+  logger.info(f"Importing products ({format})")
+  return await proxy_request(
+    "POST", f"{PRODUCTS_SERVICE}/products/import",
+    params={"format": format},
+    content=request.stream(),
+    headers={"Content-Type": request.headers.get("Content-Type", "application/octet-stream")},
+    timeout=httpx.Timeout(PRODUCT_IMPORT_TIMEOUT, connect=5.0)
+  )
 
 
 # PUT /{product_id} — Updates an existing product in the products-service
 # Takes product ID from URL path and ProductCreate model from request body
-# Forwards update request to products-service and returns updated product data
+# Streams back the updated product, or the upstream error as-is
 @router.put("/{product_id}")
 async def update_product(product_id: int, product: ProductCreate):
-  try:
-    logger.info(f"Updating product {product_id}: {product.product_name}")
-    async with httpx.AsyncClient() as client:
-      response = await client.put(
-        f"http://products-service:8005/products/{product_id}",
-        json=product.dict(),
-        headers={"Content-Type": "application/json"}
-      )
-      logger.info(f"Update product response status: {response.status_code}")
-
-      if response.status_code == 200:
-        result = response.json()
-        logger.info(f"Product updated successfully: {product_id}")
-        return result
-      else:
-        error_text = response.text
-        logger.error(f"Failed to update product: {error_text}")
-        try:
-          error_json = response.json()
-          detail = error_json.get('detail', error_text)
-        except:
-          detail = error_text
-        raise HTTPException(status_code=response.status_code, detail=f"Failed to update product: {detail}")
-  except httpx.RequestError as e:
-    logger.error(f"Request error when updating product: {e}")
-    raise HTTPException(status_code=500, detail=f"Failed to connect to product service: {str(e)}")
-  except HTTPException:
-    raise
-  except Exception as e:
-    logger.error(f"Unexpected error in update_product: {e}")
-    raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+  logger.info(f"Updating product {product_id}: {product.product_name}")
+  return await proxy_request("PUT", f"{PRODUCTS_SERVICE}/products/{product_id}", json=product.dict())
 
 
 # DELETE /{product_id} — Removes a product from the products-service
 # Takes product ID from URL path and sends delete request to products-service
-# Returns success message on 204 status or raises HTTPException on failure
+# Returns the upstream 204 on success or the upstream error (e.g. 404) as-is
 @router.delete("/{product_id}")
 async def delete_product(product_id: int):
-  try:
-    logger.info(f"Deleting product {product_id}")
-    async with httpx.AsyncClient() as client:
-      response = await client.delete(f"http://products-service:8005/products/{product_id}")
-      logger.info(f"Delete product response status: {response.status_code}")
-
-      if response.status_code == 204:
-        logger.info(f"Product {product_id} deleted successfully")
-        return {"message": "Product deleted successfully"}
-      else:
-        error_text = response.text
-        logger.error(f"Failed to delete product: {error_text}")
-        raise HTTPException(status_code=response.status_code, detail="Failed to delete product")
-  except httpx.RequestError as e:
-    logger.error(f"Request error when deleting product: {e}")
-    raise HTTPException(status_code=500, detail=f"Failed to connect to product service: {str(e)}")
-  except HTTPException:
-    raise
-  except Exception as e:
-    logger.error(f"Unexpected error in delete_product: {e}")
-    raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+  logger.info(f"Deleting product {product_id}")
+  return await proxy_request("DELETE", f"{PRODUCTS_SERVICE}/products/{product_id}")
 
 
 # GET /categories — Fetches all product categories from the products-service
 # Makes HTTP request to retrieve category list for product categorization
-# Returns categories array or handles errors with appropriate HTTP status codes
+# Forwards If-None-Match, so a 304 / ETag / Cache-Control from products-service reaches the caller
+# Streams the categories array back unparsed
 @router.get("/categories")
-async def get_categories():
-  try:
-    logger.info("Fetching categories from products-service")
-    async with httpx.AsyncClient() as client:
-      response = await client.get("http://products-service:8005/categories")
-      logger.info(f"Categories response status: {response.status_code}")
-
-      if response.status_code == 200:
-        categories = response.json()
-        logger.info(f"Retrieved {len(categories)} categories")
-        return categories
-      else:
-        error_text = response.text
-        logger.error(f"Failed to fetch categories: {error_text}")
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch categories")
-  except httpx.RequestError as e:
-    logger.error(f"Request error when fetching categories: {e}")
-    raise HTTPException(status_code=500, detail=f"Failed to connect to product service: {str(e)}")
-  except Exception as e:
-    logger.error(f"Unexpected error in get_categories: {e}")
-    raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+async def get_categories(if_none_match: Optional[str] = Header(None)):
+  headers = {"If-None-Match": if_none_match} if if_none_match else {}
+  return await proxy_request("GET", f"{PRODUCTS_SERVICE}/categories/", headers=headers)
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.staticfiles import StaticFiles
+from fastapi import APIRouter, HTTPException, Request
+from datetime import datetime, timezone
+import asyncio
 import os
-import uuid
-import shutil
 from pathlib import Path
+from ..helpers import image_processor, InvalidImage, UploadIndex, receive_upload
 
 router = APIRouter()
 
@@ -15,57 +15,100 @@ Path(UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
+# The body is parsed by receive_upload rather than FastAPI, so describe the form for the docs
+UPLOAD_FORM_SCHEMA = {
+  "requestBody": {
+    "required": True,
+    "content": {
+      "multipart/form-data": {
+        "schema": {
+          "type": "object",
+          "required": ["file"],
+          "properties": {"file": {"type": "string", "format": "binary"}}
+        }
+      }
+    }
+  }
+}
 
-# POST / — Handles image file uploads with validation and storage
-# Validates file type against allowed extensions, checks file size limits,
-# generates unique filename using UUID, saves file to uploads directory,
-# and returns metadata including the accessible URL path
-@router.post("/")
-async def upload_image(file: UploadFile = File(...)):
-  # Validate file type
-  file_extension = os.path.splitext(file.filename)[1].lower()
-  if file_extension not in ALLOWED_EXTENSIONS:
-    raise HTTPException(
-      status_code=400,
-      detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
-    )
-
-  # Validate file size
-  file.file.seek(0, 2)  # Seek to end of file
-  file_size = file.file.tell()  # Get current position (file size)
-  file.file.seek(0)  # Reset to beginning
+# sha256 -> stored file and derivatives; a dot-file so the static mount never serves it
+upload_index = UploadIndex(Path(UPLOAD_DIR) / ".index.json")
 
-  if file_size > MAX_FILE_SIZE:
-    raise HTTPException(
-      status_code=400,
-      detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024 * 1024)}MB"
-    )
 
-  # Generate unique filename
-  file_id = str(uuid.uuid4())
-  filename = f"{file_id}{file_extension}"
-  filepath = os.path.join(UPLOAD_DIR, filename)
+# POST / — Handles image file uploads with validation and storage
+# Streams the multipart body chunk by chunk: rejects with 413 as soon as MAX_FILE_SIZE is passed and
+# with 400 unless the extension is allowed and the magic bytes are a JPEG, PNG, GIF or WebP image;
+# hashes the bytes while writing them (in a worker thread) and stores them as <sha256><ext>;
+# content that was uploaded before is answered from the index without writing or resizing again,
+# new content gets resized WebP/JPEG derivatives (thumb, card, detail) on the image process pool,
+# and returns metadata including the accessible URL path of the original and each derivative
+@router.post("/", openapi_extra=UPLOAD_FORM_SCHEMA)
+async def upload_image(request: Request):
+  upload = await receive_upload(request, "file", Path(UPLOAD_DIR), MAX_FILE_SIZE, ALLOWED_EXTENSIONS)
 
   try:
-    # Save file
-    with open(filepath, "wb") as buffer:
-      shutil.copyfileobj(file.file, buffer)
+    existing = upload_index.get(upload.sha256)
+    if existing:
+      await asyncio.to_thread(upload.temp_path.unlink)
+      return upload_response(existing, duplicate=True)
 
-    # Return URL relative to static files
-    image_url = f"/static/uploads/{filename}"
+    # Stored under the extension of the detected format, whatever the client named the file
+    filename = f"{upload.sha256}{upload.extension}"
+    await asyncio.to_thread(os.replace, upload.temp_path, Path(UPLOAD_DIR) / filename)
+    derivatives = await image_processor.render(Path(UPLOAD_DIR) / filename, Path(UPLOAD_DIR), upload.sha256)
 
-    return {
-      "url": image_url,
+    entry = {
+      "sha256": upload.sha256,
       "filename": filename,
-      "size": file_size,
-      "type": file.content_type
+      "size": upload.size,
+      "type": upload.content_type,
+      "uploaded_at": datetime.now(timezone.utc).isoformat(),
+      "derivatives": derivatives
     }
+    await asyncio.to_thread(upload_index.put, upload.sha256, entry)
+    return upload_response(entry, duplicate=False)
 
+  except (InvalidImage, HTTPException) as e:
+    await asyncio.to_thread(remove_upload, upload.temp_path, upload.sha256)
+    if isinstance(e, HTTPException):
+      raise
+    raise HTTPException(status_code=400, detail=str(e))
   except Exception as e:
     # Clean up file if it was partially created
-    if os.path.exists(filepath):
-      os.remove(filepath)
+    await asyncio.to_thread(remove_upload, upload.temp_path, upload.sha256)
     raise HTTPException(
       status_code=500,
       detail=f"Failed to save file: {str(e)}"
     )
+
+
+# Builds the upload response from an index entry, with URLs relative to static files
+def upload_response(entry: dict, duplicate: bool):
+  return {
+    "url": f"/static/uploads/{entry['filename']}",
+    "filename": entry["filename"],
+    "sha256": entry["sha256"],
+    "size": entry["size"],
+    "type": entry["type"],
+    "duplicate": duplicate,
+    "derivatives": {
+      size: {
+        "width": derivative["width"],
+        "height": derivative["height"],
+        "webp": f"/static/uploads/{derivative['webp']}",
+        "jpeg": f"/static/uploads/{derivative['jpeg']}"
+      }
+      for size, derivative in entry["derivatives"].items()
+    }
+  }
+
+
+# Deletes a failed upload's temporary file, and its stored original and derivatives unless an
+# indexed upload of the same content owns them
+def remove_upload(temp_path: Path, sha256: str = None):
+  paths = [temp_path]
+  if sha256 and not upload_index.get(sha256):
+    paths += Path(UPLOAD_DIR).glob(f"{sha256}*")
+  for path in paths:
+    if path.exists():
+      path.unlink()
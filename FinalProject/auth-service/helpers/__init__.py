@@ -1,2 +1,3 @@
 from .cookieManager import set_session_cookie
 from .customer_client import fetch_customer_by_email, create_customer
+from .password_hasher import password_hasher
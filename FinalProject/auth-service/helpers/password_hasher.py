@@ -0,0 +1,95 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+# bcrypt releases the GIL while hashing, so a small thread pool runs hashes in parallel
+# without blocking the event loop; keep it at or below the CPU cores given to the container
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hashes allowed to wait for a free worker before new logins are turned away with 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+
+# Runs bcrypt hash/verify on a bounded ThreadPoolExecutor instead of the event loop
+# Admission is capped at workers + max_queue in-flight calls; beyond that callers get a 503
+# so a login burst sheds load instead of building an unbounded backlog of ~250 ms jobs
+class PasswordHasher:
+    def __init__(self, context: CryptContext, workers: int, max_queue: int):
+        self.context = context
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._wait_seconds = 0.0
+        self._hash_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(self.context.verify, password, hashed)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Authentication busy, retry shortly", headers={"Retry-After": "1"})
+            self._in_flight += 1
+            self.peak_queued = max(self.peak_queued, self._in_flight - self._running)
+
+        submitted = time.perf_counter()
+
+        # Only successful calls count as completed and feed the averages; errors count as failed
+        def job():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                result = fn(*args)
+            except Exception:
+                with self._lock:
+                    self._running -= 1
+                    self.failed += 1
+                raise
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+                self._wait_seconds += started - submitted
+                self._hash_seconds += time.perf_counter() - started
+            return result
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    # Snapshot of pool usage for the /debug/password-hasher endpoint
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._in_flight - self._running,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self._wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+                "avg_hash_ms": round(self._hash_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+            }
+
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = PasswordHasher(pwd_context, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
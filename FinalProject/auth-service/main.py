@@ -1,8 +1,17 @@
 from fastapi import FastAPI
 from routers import auth
+from helpers import password_hasher
 from fastapi.middleware.cors import CORSMiddleware
+from common.http_client import http_client_lifespan
+from common.metrics import setup_metrics
+from models.database import engine
+from common.database import pool_status
+from common.session_verifier import get_session_verifier
 
-app = FastAPI()
+app = FastAPI(lifespan=http_client_lifespan)
+
+# GET /metrics — Prometheus request, database and outbound HTTP metrics for this service
+setup_metrics(app, engines=[engine])
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,3 +27,21 @@ app.include_router(auth.router, prefix="/auth")
 @app.get("/health")
 def health_check():
     return {"service": "auth-service", "status": "healthy"}
+
+# GET /debug/db-pool — Reports this worker's database connection pool usage
+# Returns pool size, checked-out and overflow counts for tuning DB_POOL_SIZE / DB_MAX_OVERFLOW
+@app.get("/debug/db-pool")
+def db_pool_stats():
+    return pool_status(engine)
+
+# GET /debug/password-hasher — Reports the bcrypt worker pool usage
+# Returns running/queued hashes, peak queue depth, rejections and average wait/hash times for this worker
+@app.get("/debug/password-hasher")
+def password_hasher_stats():
+    return password_hasher.stats()
+
+# GET /debug/session-cache — Reports the verified-token cache counters
+# Returns size and hit rate of the in-process session verifier used by /auth/verify
+@app.get("/debug/session-cache")
+def session_cache_stats():
+    return get_session_verifier().stats()
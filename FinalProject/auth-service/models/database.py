@@ -1,15 +1,15 @@
 # database.py
 import os
 from dotenv import load_dotenv
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import create_engine
+from sqlalchemy.orm import declarative_base
+from common.database import create_db_engine, create_session_factory
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+engine = create_db_engine(DATABASE_URL)
+SessionLocal = create_session_factory(engine)
 Base = declarative_base()
 
 # Creates and manages database session lifecycle for dependency injection
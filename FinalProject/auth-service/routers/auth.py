@@ -3,14 +3,13 @@ from fastapi.responses import RedirectResponse, JSONResponse
 from pydantic import BaseModel
 from models import get_db
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from jose import jwt, JWTError
+from jose import jwt
 from datetime import datetime, timedelta
-from helpers import set_session_cookie, fetch_customer_by_email, create_customer
+from helpers import set_session_cookie, fetch_customer_by_email, create_customer, password_hasher
 from config import SECRET_KEY, ALGORITHM
+from common.session_verifier import InvalidSession, get_session_verifier
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class LoginRequest(BaseModel):
     email: str
@@ -24,7 +23,7 @@ async def login_customer(login_data: LoginRequest):
     print("Login attempt:", login_data.email)
     customer = await fetch_customer_by_email(login_data.email)  # Add await
 
-    if not customer or not pwd_context.verify(login_data.password, customer["password"]):
+    if not customer or not await password_hasher.verify(login_data.password, customer["password"]):
       raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     token = create_access_token({"sub": customer["email_address"]})
@@ -66,7 +65,7 @@ async def register_customer(payload: RegisterRequest, response: Response):  # Ma
     if existing_customer:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = pwd_context.hash(payload.password)
+    hashed_password = await password_hasher.hash(payload.password)
 
     customer_data = {
         "email_address": payload.email_address,
@@ -139,24 +138,19 @@ def logout_customer(response: Response):
   )
 
 # GET /auth/verify — Validates session token and returns user information
-# Decodes JWT token from session cookie, validates authenticity
+# Verifies the session cookie JWT in-process (common.session_verifier caches it until exp)
 # Returns user email and customer_id if session is valid, raises 401 if invalid
 @router.get("/verify")
-def verify_session(
+async def verify_session(
     session: str = Cookie(None),
     customer_id: str = Cookie(None)
 ):
-    print("Incoming session cookie:", session)
-    print("Incoming customer_id cookie:", customer_id)
-
     if not session or not customer_id:
         raise HTTPException(status_code=401, detail="Missing cookies")
 
     try:
-        payload = jwt.decode(session, SECRET_KEY, algorithms=[ALGORITHM])
-        print("Decoded JWT payload:", payload)
-    except JWTError as e:
-        print("JWT decode error:", str(e))
+        payload = get_session_verifier().verify(session)
+    except InvalidSession:
         raise HTTPException(status_code=401, detail="Invalid session token")
 
     return {"message": "Session valid",
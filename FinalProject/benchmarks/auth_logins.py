@@ -0,0 +1,105 @@
+"""Measures logins per second on one auth-service worker with inline versus pooled bcrypt.
+
+Usage (from the FinalProject folder):
+    python benchmarks/auth_logins.py --logins 40 --concurrency 10
+    PASSWORD_HASH_WORKERS=4 python benchmarks/auth_logins.py --logins 80
+
+Drives POST /auth/login in-process with customer-service stubbed out, while a probe keeps
+calling GET /health. "inline" reproduces the old behaviour (bcrypt on the event loop);
+"pool" uses helpers.password_hasher. The health latency shows how long other requests on
+the same worker wait while logins are being verified.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent / "auth-service"
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+sys.path.insert(0, str(SERVICE_DIR))
+sys.path.insert(0, str(SERVICE_DIR.parent))
+
+import httpx  # noqa: E402
+from main import app  # noqa: E402
+from routers import auth  # noqa: E402
+from helpers.password_hasher import password_hasher  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+# Same interface as PasswordHasher but runs bcrypt directly on the event loop
+class InlineHasher:
+  def __init__(self, context):
+    self.context = context
+
+  async def hash(self, password):
+    return self.context.hash(password)
+
+  async def verify(self, password, hashed):
+    return self.context.verify(password, hashed)
+
+
+async def run(hasher, total: int, concurrency: int, customer: dict):
+  auth.password_hasher = hasher
+  semaphore = asyncio.Semaphore(concurrency)
+  probe_latencies = []
+  done = asyncio.Event()
+
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+    async def login(n):
+      async with semaphore:
+        response = await client.post("/auth/login", json={"email": customer["email_address"], "password": PASSWORD})
+        response.raise_for_status()
+
+    async def probe():
+      while not done.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        probe_latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*[login(n) for n in range(total)])
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+
+  return elapsed, probe_latencies
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--logins", type=int, default=40)
+  parser.add_argument("--concurrency", type=int, default=10)
+  args = parser.parse_args()
+
+  customer = {
+    "customer_id": 1,
+    "email_address": "bench@example.com",
+    "password": password_hasher.context.hash(PASSWORD),
+  }
+
+  async def fetch_customer_by_email(email):
+    return customer
+
+  auth.fetch_customer_by_email = fetch_customer_by_email
+
+  print(f"{args.logins} logins, concurrency {args.concurrency}, {password_hasher.workers} hash workers, {os.cpu_count()} CPUs")
+  for name, hasher in (("inline", InlineHasher(password_hasher.context)), ("pool", password_hasher)):
+    elapsed, probes = asyncio.run(run(hasher, args.logins, args.concurrency, customer))
+    p50 = statistics.median(probes) * 1000
+    worst = max(probes) * 1000
+    print(f"  {name:<7} {args.logins / elapsed:6.1f} logins/s  /health p50 {p50:7.1f} ms  max {worst:7.1f} ms")
+
+  print("  pool stats:", password_hasher.stats())
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,99 @@
+"""Shows connection reuse of the shared pooled httpx client versus a client per request.
+
+Usage (from the FinalProject folder):
+    python benchmarks/http_pool.py --requests 2000 --concurrency 20
+    python benchmarks/http_pool.py --url http://localhost:8005/health
+
+Without --url a local keep-alive HTTP/1.1 server is started so the number of TCP
+connections each strategy opens can be counted exactly.
+"""
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from common.http_client import create_http_client  # noqa: E402
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+  connections = 0
+  lock = threading.Lock()
+
+  # setup() runs once per accepted TCP connection, handle() then serves every keep-alive request on it
+  def setup(self):
+    super().setup()
+    with CountingHandler.lock:
+      CountingHandler.connections += 1
+
+  def do_GET(self):
+    body = b'{"status":"healthy"}'
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format, *args):
+    pass
+
+
+# Issues every request through a brand-new AsyncClient, as the services used to
+async def client_per_request(url: str, total: int, concurrency: int):
+  semaphore = asyncio.Semaphore(concurrency)
+
+  async def one():
+    async with semaphore:
+      async with httpx.AsyncClient() as client:
+        (await client.get(url)).raise_for_status()
+
+  await asyncio.gather(*[one() for _ in range(total)])
+
+
+# Issues every request through one pooled client built by common.http_client
+async def shared_client(url: str, total: int, concurrency: int):
+  semaphore = asyncio.Semaphore(concurrency)
+  async with create_http_client() as client:
+    async def one():
+      async with semaphore:
+        (await client.get(url)).raise_for_status()
+
+    await asyncio.gather(*[one() for _ in range(total)])
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--requests", type=int, default=1000)
+  parser.add_argument("--concurrency", type=int, default=20)
+  parser.add_argument("--url", default=None)
+  args = parser.parse_args()
+
+  server = None
+  url = args.url
+  if url is None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/health"
+
+  print(f"{args.requests} requests, concurrency {args.concurrency}, {url}")
+  for name, strategy in (("client per request", client_per_request), ("shared pool", shared_client)):
+    CountingHandler.connections = 0
+    start = time.perf_counter()
+    asyncio.run(strategy(url, args.requests, args.concurrency))
+    elapsed = time.perf_counter() - start
+    connections = f"{CountingHandler.connections:6d} connections" if server else ""
+    print(f"  {name:<19} {elapsed:7.2f} s  {args.requests / elapsed:8.0f} req/s  {connections}")
+
+  if server:
+    server.shutdown()
+
+
+if __name__ == "__main__":
+  main()
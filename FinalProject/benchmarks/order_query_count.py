@@ -0,0 +1,127 @@
+"""Guards against N+1 queries in the order-service listing endpoints.
+
+Usage (from the FinalProject folder):
+    python benchmarks/order_query_count.py
+
+Seeds customers with 1, 20 and 200 orders in a throwaway SQLite database, counts the
+SQL statements each listing endpoint issues, and exits non-zero if the count grows
+with the number of orders or items. Also writes orders with 0, 3 and 20 items through
+the create path and fails if one errors or comes back without all of its items.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent / "order-service"
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "order_queries.db")
+sys.path.insert(0, str(SERVICE_DIR))
+sys.path.insert(0, str(SERVICE_DIR.parent))
+
+from fastapi import Response  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from models import Base, Order, OrderItem  # noqa: E402
+from models.database import SessionLocal, engine  # noqa: E402
+from routers.orders import get_order, get_orders, update_order, write_order  # noqa: E402
+from schemas import OrderCreate, OrderItemCreate, OrderUpdate  # noqa: E402
+
+ORDER_COUNTS = (1, 20, 200)
+ITEMS_PER_ORDER = 3
+# Item counts written through write_order; 0 covers orders created without items
+WRITE_ITEM_COUNTS = (0, 3, 20)
+
+
+# Creates one customer per entry in ORDER_COUNTS owning that many orders
+def seed():
+  Base.metadata.create_all(bind=engine)
+  with SessionLocal() as db:
+    for customer_id, count in enumerate(ORDER_COUNTS, start=1):
+      for _ in range(count):
+        order = Order(
+          customer_id=customer_id, order_date=datetime.now(), ship_amount=0, tax_amount=0,
+          ship_address_id=1, card_type="Visa", card_number="4" * 16, card_expires="01/30",
+          billing_address_id=1,
+          items=[
+            OrderItem(product_id=n, item_price=10, discount_amount=0, quantity=1)
+            for n in range(1, ITEMS_PER_ORDER + 1)
+          ]
+        )
+        db.add(order)
+    db.commit()
+
+
+# Runs one handler call in a fresh session and returns how many statements it executed
+def count_queries(call):
+  statements = []
+
+  def record(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+  event.listen(engine, "before_cursor_execute", record)
+  try:
+    with SessionLocal() as db:
+      asyncio.run(call(db))
+  finally:
+    event.remove(engine, "before_cursor_execute", record)
+  return len(statements)
+
+
+# Writes one order per entry in WRITE_ITEM_COUNTS; passes when every write returns all its items
+# Statement counts are reported only: SQLite inserts RETURNING rows one at a time to keep their order
+def check_write_order() -> bool:
+  counts = []
+  for item_count in WRITE_ITEM_COUNTS:
+    order_data = OrderCreate(
+      customer_id=1, ship_address_id=1, card_type="Visa", card_number="4" * 16, card_expires="01/30",
+      billing_address_id=1,
+      items=[OrderItemCreate(product_id=n, item_price=10, quantity=1) for n in range(1, item_count + 1)]
+    )
+
+    async def write(db):
+      order = write_order(db, order_data)
+      if len(order.items) != item_count:
+        raise RuntimeError(f"expected {item_count} items, got {len(order.items)}")
+
+    try:
+      counts.append(count_queries(write))
+    except Exception as e:
+      print(f"FAIL {'write_order':<13} {item_count} items: {type(e).__name__}: {str(e).splitlines()[0]}")
+      return False
+
+  detail = ", ".join(f"{items} items: {queries}" for items, queries in zip(WRITE_ITEM_COUNTS, counts))
+  print(f"ok   {'write_order':<13} {detail}")
+  return True
+
+
+def main():
+  seed()
+  with SessionLocal() as db:
+    first_order = {
+      customer_id: db.query(Order.order_id).filter(Order.customer_id == customer_id).first()[0]
+      for customer_id in range(1, len(ORDER_COUNTS) + 1)
+    }
+
+  checks = {
+    "get_orders": lambda customer_id: lambda db: get_orders(
+      response=Response(), customer_id=customer_id, limit=1000, cursor=None, db=db),
+    "get_order": lambda customer_id: lambda db: get_order(order_id=first_order[customer_id], db=db),
+    "update_order": lambda customer_id: lambda db: update_order(
+      order_id=first_order[customer_id], order_update=OrderUpdate(ship_amount=5), db=db),
+  }
+
+  failed = False
+  for name, build in checks.items():
+    counts = [count_queries(build(customer_id)) for customer_id in range(1, len(ORDER_COUNTS) + 1)]
+    constant = len(set(counts)) == 1
+    failed = failed or not constant
+    detail = ", ".join(f"{orders} orders: {queries}" for orders, queries in zip(ORDER_COUNTS, counts))
+    print(f"{'ok  ' if constant else 'FAIL'} {name:<13} {detail}")
+
+  failed = not check_write_order() or failed
+  sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+  main()
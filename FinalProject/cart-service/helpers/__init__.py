@@ -0,0 +1,2 @@
+from .price_cache import price_cache, get_prices
+from .cart_store import cart_store, cart_store_lifespan
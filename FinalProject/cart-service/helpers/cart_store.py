@@ -0,0 +1,352 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+from models.cart_items import CartItem
+from models.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# "database" commits every cart change immediately; "memory" serves carts from this process
+# and writes coalesced changes to cart_items every CART_FLUSH_INTERVAL seconds (write-behind)
+CART_BACKEND = os.getenv("CART_BACKEND", "database")
+CART_FLUSH_INTERVAL = float(os.getenv("CART_FLUSH_INTERVAL", "1.0"))
+# Clean carts beyond this many are dropped from memory, least recently used first
+CART_STORE_MAX_CARTS = int(os.getenv("CART_STORE_MAX_CARTS", "10000"))
+
+
+@dataclass
+class CartLine:
+    id: int
+    customer_id: int
+    product_id: int
+    quantity: int
+    updated_at: Optional[datetime] = None
+
+
+# Builds one INSERT ... ON DUPLICATE KEY UPDATE (ON CONFLICT DO UPDATE on SQLite) for many lines
+# Relies on the unique_customer_product key; merge=True adds quantities, otherwise they are replaced
+def upsert_cart_lines(db: Session, rows: list[dict], merge: bool):
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(CartItem).values(rows)
+        incoming = statement.inserted.quantity
+        quantity = CartItem.quantity + incoming if merge else incoming
+        statement = statement.on_duplicate_key_update(quantity=quantity, updated_at=func.now())
+    elif dialect == "sqlite":
+        statement = sqlite.insert(CartItem).values(rows)
+        incoming = statement.excluded.quantity
+        quantity = CartItem.quantity + incoming if merge else incoming
+        statement = statement.on_conflict_do_update(
+            index_elements=["customer_id", "product_id"],
+            set_={"quantity": quantity, "updated_at": func.now()}
+        )
+    else:
+        raise RuntimeError(f"Cart upsert is not supported on {dialect}")
+    db.execute(statement)
+
+
+def _to_line(item: CartItem) -> CartLine:
+    return CartLine(item.id, item.customer_id, item.product_id, item.quantity, item.updated_at)
+
+
+# Interface the cart routes use; a shared store (e.g. Redis) plugs in by implementing it
+# Quantities passed to set_quantities replace the current ones, 0 removes the line
+class CartStore(ABC):
+    write_behind = False
+
+    @abstractmethod
+    def get_cart(self, customer_id: int) -> list[CartLine]:
+        ...
+
+    @abstractmethod
+    def add(self, customer_id: int, product_id: int, quantity: int) -> CartLine:
+        ...
+
+    @abstractmethod
+    def set_quantities(self, customer_id: int, quantities: dict[int, int]) -> list[CartLine]:
+        ...
+
+    # Returns False when no line has this id
+    @abstractmethod
+    def remove_item(self, item_id: int) -> bool:
+        ...
+
+    # Writes pending changes to cart_items and returns how many lines were written
+    def flush(self) -> int:
+        return 0
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__}
+
+
+# Direct mode: every call is its own transaction against cart_items
+class DatabaseCartStore(CartStore):
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def get_cart(self, customer_id):
+        with self.session_factory() as db:
+            items = db.query(CartItem).filter(CartItem.customer_id == customer_id).order_by(CartItem.id).all()
+            return [_to_line(item) for item in items]
+
+    def add(self, customer_id, product_id, quantity):
+        with self.session_factory() as db:
+            upsert_cart_lines(db, [{"customer_id": customer_id, "product_id": product_id, "quantity": quantity}], merge=True)
+            # Read back inside the same transaction, while the upsert still holds the row lock
+            line = _to_line(db.query(CartItem).filter(
+                CartItem.customer_id == customer_id,
+                CartItem.product_id == product_id
+            ).one())
+            db.commit()
+            return line
+
+    def set_quantities(self, customer_id, quantities):
+        rows = [
+            {"customer_id": customer_id, "product_id": product_id, "quantity": quantity}
+            for product_id, quantity in quantities.items() if quantity > 0
+        ]
+        removed = [product_id for product_id, quantity in quantities.items() if quantity == 0]
+        with self.session_factory() as db:
+            if rows:
+                upsert_cart_lines(db, rows, merge=False)
+            if removed:
+                db.execute(delete(CartItem).where(
+                    CartItem.customer_id == customer_id,
+                    CartItem.product_id.in_(removed)
+                ))
+            db.commit()
+        return self.get_cart(customer_id)
+
+    def remove_item(self, item_id):
+        # Core DELETE: the ORM unit of work would need the customers/products tables mapped here
+        with self.session_factory() as db:
+            removed = db.execute(delete(CartItem).where(CartItem.id == item_id)).rowcount
+            db.commit()
+            return removed > 0
+
+
+# Write-behind mode: carts live in this process and reads never touch MySQL once loaded
+# Changes mark (customer_id, product_id) dirty; flush() writes each dirty line once, however
+# many times it changed, as one multi-row upsert plus one delete. Removed lines are kept as
+# quantity-0 tombstones until flushed so a re-add reuses the row id already in cart_items.
+# New ids are allocated in memory from MAX(id), so only one process may own the table in this
+# mode (run a single worker); changes made after the last flush are lost if the process dies.
+class WriteBehindCartStore(CartStore):
+    write_behind = True
+
+    def __init__(self, session_factory=SessionLocal, max_carts: int = CART_STORE_MAX_CARTS):
+        self.session_factory = session_factory
+        self.max_carts = max_carts
+        self._lock = threading.RLock()
+        self._carts = OrderedDict()   # customer_id -> {product_id: CartLine}
+        self._by_id = {}              # item id -> (customer_id, product_id)
+        self._dirty = set()           # (customer_id, product_id)
+        self._in_flight = set()       # keys taken by a flush that has not committed yet
+        self._next_id = None
+        self.flushes = 0
+        self.lines_flushed = 0
+        self.flush_failures = 0
+        self.last_flush_ms = 0.0
+
+    def _allocate_id(self) -> int:
+        if self._next_id is None:
+            with self.session_factory() as db:
+                self._next_id = (db.scalar(select(func.max(CartItem.id))) or 0) + 1
+        allocated = self._next_id
+        self._next_id += 1
+        return allocated
+
+    # Returns the customer's in-memory cart, loading it from cart_items on first use
+    def _cart(self, customer_id: int) -> dict:
+        cart = self._carts.get(customer_id)
+        if cart is None:
+            with self.session_factory() as db:
+                items = db.query(CartItem).filter(CartItem.customer_id == customer_id).all()
+                cart = {item.product_id: _to_line(item) for item in items}
+            for line in cart.values():
+                self._by_id[line.id] = (customer_id, line.product_id)
+            self._carts[customer_id] = cart
+            self._evict(keep=customer_id)
+        self._carts.move_to_end(customer_id)
+        return cart
+
+    # Drops least recently used carts that have nothing waiting to be flushed or being flushed
+    def _evict(self, keep: int = None):
+        if len(self._carts) <= self.max_carts:
+            return
+        dirty_customers = {customer_id for customer_id, _ in self._dirty | self._in_flight}
+        for customer_id in list(self._carts):
+            if len(self._carts) <= self.max_carts:
+                break
+            if customer_id == keep or customer_id in dirty_customers:
+                continue
+            for line in self._carts.pop(customer_id).values():
+                self._by_id.pop(line.id, None)
+
+    def _set(self, customer_id: int, product_id: int, quantity: int) -> CartLine:
+        cart = self._cart(customer_id)
+        line = cart.get(product_id)
+        if line is None:
+            line = CartLine(self._allocate_id(), customer_id, product_id, 0)
+            cart[product_id] = line
+            self._by_id[line.id] = (customer_id, product_id)
+        line.quantity = quantity
+        line.updated_at = datetime.now()
+        self._dirty.add((customer_id, product_id))
+        return line
+
+    def get_cart(self, customer_id):
+        with self._lock:
+            lines = sorted(self._cart(customer_id).values(), key=lambda line: line.id)
+            return [CartLine(**vars(line)) for line in lines if line.quantity > 0]
+
+    def add(self, customer_id, product_id, quantity):
+        with self._lock:
+            current = self._cart(customer_id).get(product_id)
+            line = self._set(customer_id, product_id, (current.quantity if current else 0) + quantity)
+            return CartLine(**vars(line))
+
+    def set_quantities(self, customer_id, quantities):
+        with self._lock:
+            cart = self._cart(customer_id)
+            for product_id, quantity in quantities.items():
+                if quantity > 0 or product_id in cart:
+                    self._set(customer_id, product_id, quantity)
+        return self.get_cart(customer_id)
+
+    def remove_item(self, item_id):
+        with self._lock:
+            key = self._by_id.get(item_id)
+            if key is None:
+                # Not loaded yet (or unknown): load the owning cart, then look again
+                with self.session_factory() as db:
+                    customer_id = db.scalar(select(CartItem.customer_id).where(CartItem.id == item_id))
+                if customer_id is None:
+                    return False
+                self._cart(customer_id)
+                key = self._by_id.get(item_id)
+            customer_id, product_id = key
+            line = self._carts[customer_id][product_id]
+            if line.quantity == 0:
+                return False
+            self._set(customer_id, product_id, 0)
+            return True
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return 0
+            pending = self._dirty
+            self._dirty = set()
+            self._in_flight = pending
+            lines = [
+                CartLine(**vars(self._carts[customer_id][product_id]))
+                for customer_id, product_id in pending
+                if product_id in self._carts.get(customer_id, {})
+            ]
+
+        started = time.perf_counter()
+        upserts = [
+            {"id": line.id, "customer_id": line.customer_id, "product_id": line.product_id, "quantity": line.quantity}
+            for line in lines if line.quantity > 0
+        ]
+        removed = [line.id for line in lines if line.quantity == 0]
+        try:
+            with self.session_factory() as db:
+                if removed:
+                    db.execute(delete(CartItem).where(CartItem.id.in_(removed)))
+                if upserts:
+                    upsert_cart_lines(db, upserts, merge=False)
+                db.commit()
+        except Exception:
+            # Put the keys back so the next flush retries them with whatever state is current then;
+            # only keys still held in memory can be retried
+            with self._lock:
+                self._dirty |= {
+                    (customer_id, product_id) for customer_id, product_id in pending
+                    if product_id in self._carts.get(customer_id, {})
+                }
+                self._in_flight = set()
+                self.flush_failures += 1
+            raise
+
+        with self._lock:
+            self._in_flight = set()
+            # Tombstones that stayed removed are no longer needed once the delete is committed
+            for line in lines:
+                key = (line.customer_id, line.product_id)
+                current = self._carts.get(line.customer_id, {}).get(line.product_id)
+                if line.quantity == 0 and current is not None and current.quantity == 0 and key not in self._dirty:
+                    del self._carts[line.customer_id][line.product_id]
+                    self._by_id.pop(line.id, None)
+            self.flushes += 1
+            self.lines_flushed += len(lines)
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+            self._evict()
+        return len(lines)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": type(self).__name__,
+                "carts_in_memory": len(self._carts),
+                "pending_lines": len(self._dirty),
+                "flush_interval_seconds": CART_FLUSH_INTERVAL,
+                "flushes": self.flushes,
+                "lines_flushed": self.lines_flushed,
+                "flush_failures": self.flush_failures,
+                "last_flush_ms": self.last_flush_ms,
+            }
+
+
+def create_cart_store(backend: str = CART_BACKEND) -> CartStore:
+    if backend == "database":
+        return DatabaseCartStore()
+    if backend == "memory":
+        return WriteBehindCartStore()
+    raise ValueError(f"Unknown CART_BACKEND '{backend}' (expected 'database' or 'memory')")
+
+
+cart_store = create_cart_store()
+
+
+# FastAPI lifespan that flushes a write-behind store every CART_FLUSH_INTERVAL seconds
+# and once more at shutdown; does nothing for the database backend
+@asynccontextmanager
+async def cart_store_lifespan(app):
+    if not cart_store.write_behind:
+        yield
+        return
+
+    async def flush_periodically():
+        while True:
+            await asyncio.sleep(CART_FLUSH_INTERVAL)
+            try:
+                await run_in_threadpool(cart_store.flush)
+            except Exception:
+                logger.exception("Cart flush failed; changes stay pending and will be retried")
+
+    flusher = asyncio.create_task(flush_periodically())
+    try:
+        yield
+    finally:
+        flusher.cancel()
+        try:
+            await flusher
+        except asyncio.CancelledError:
+            pass
+        await run_in_threadpool(cart_store.flush)
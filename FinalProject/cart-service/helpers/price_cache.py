@@ -0,0 +1,41 @@
+import os
+from common.cache import TTLCache
+from common.catalog_client import get_products_info
+
+PRICE_CACHE_SIZE = int(os.getenv("PRICE_CACHE_SIZE", "5000"))
+# Kept short so price and discount edits in the admin dashboard show up in carts quickly
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", "30"))
+
+# Product name/price/discount keyed by product_id, shared by every request in this worker
+# Products missing from the catalog are cached as False so they aren't looked up on every render
+price_cache = TTLCache(maxsize=PRICE_CACHE_SIZE, ttl=PRICE_CACHE_TTL)
+
+
+# Returns {product_id: {"product_name", "list_price", "discount_percent"}} for the given ids
+# Cached entries are used as-is; the rest come from one batched products-service lookup
+# Ids no longer in the catalog are left out; returns None if products-service is unavailable
+async def get_prices(product_ids) -> dict | None:
+    prices = {}
+    missing = []
+    for product_id in dict.fromkeys(product_ids):
+        entry = price_cache.get(product_id)
+        if entry is None:
+            missing.append(product_id)
+        elif entry:
+            prices[product_id] = entry
+
+    if missing:
+        products = await get_products_info(missing)
+        if products is None:
+            return None
+        for product_id in missing:
+            product = products.get(product_id)
+            entry = {
+                "product_name": product["product_name"],
+                "list_price": float(product["list_price"]),
+                "discount_percent": float(product.get("discount_percent") or 0),
+            } if product else False
+            price_cache.set(product_id, entry)
+            if entry:
+                prices[product_id] = entry
+    return prices
@@ -1,9 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from routers import cart
+from models.database import engine
+from common.database import pool_status
+from common.http_client import http_client_lifespan
+from common.metrics import setup_metrics
+from helpers import price_cache, cart_store, cart_store_lifespan
 
-app = FastAPI()
+# Opens the shared HTTP client and, with CART_BACKEND=memory, runs the cart flush timer
+# The cart store exits first so its final flush completes before shutdown
+@asynccontextmanager
+async def lifespan(app):
+    async with http_client_lifespan(app), cart_store_lifespan(app):
+        yield
+
+app = FastAPI(lifespan=lifespan)
+
+# GET /metrics — Prometheus request, database and outbound HTTP metrics for this service
+setup_metrics(app, engines=[engine])
 app.include_router(cart.router)
 
 @app.get("/health")
 def health_check():
     return {"service": "cart-service", "status": "healthy"}
+
+# GET /debug/db-pool — Reports this worker's database connection pool usage
+# Returns pool size, checked-out and overflow counts for tuning DB_POOL_SIZE / DB_MAX_OVERFLOW
+@app.get("/debug/db-pool")
+def db_pool_stats():
+    return pool_status(engine)
+
+# GET /debug/price-cache — Reports the product price cache counters
+# Returns size, hit/miss counts and hit rate for the prices used by GET /cart-items/summary
+@app.get("/debug/price-cache")
+def price_cache_stats():
+    return price_cache.stats()
+
+# GET /debug/cart-store — Reports the active cart backend
+# With CART_BACKEND=memory returns carts held in memory, pending lines and flush counters
+@app.get("/debug/cart-store")
+def cart_store_stats():
+    return cart_store.stats()
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, BigInteger, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, BigInteger, Integer, ForeignKey, DateTime, UniqueConstraint
 from models.database import Base
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    # One row per customer/product; adds merge into it (see helpers/cart_store.py upsert_cart_lines)
+    __table_args__ = (UniqueConstraint("customer_id", "product_id", name="unique_customer_product"),)
 
     id = Column(BigInteger, primary_key=True)
     customer_id = Column(Integer, ForeignKey("customers.customer_id"))
@@ -1,46 +1,75 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from models.cart_items import CartItem
-from schemas.cart_item import CartItemCreate, CartItemOut
-from models.database import SessionLocal
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from schemas.cart_item import CartItemCreate, CartItemOut, CartItemsPatch, CartSummaryOut
+from helpers import get_prices, cart_store
 
 router = APIRouter()
 
-# Creates and manages database session lifecycle for dependency injection
-# Yields database session for request processing, ensures proper cleanup on completion
-# Used as FastAPI dependency to provide database access to route handlers
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-# POST /cart-items — Adds a new item to customer's shopping cart
-# Creates CartItem record with customer ID, product ID, and quantity
-# Returns created cart item with generated ID and timestamp
+# Cart reads and writes go through helpers.cart_store, selected by CART_BACKEND:
+# "database" commits each change immediately, "memory" serves carts from memory and flushes on a timer
+
+# POST /cart-items — Adds an item to customer's shopping cart, merging with an existing line
+# Single atomic upsert: a repeat add increments the quantity instead of hitting the unique key
+# Returns the resulting cart line with its ID and new quantity
 @router.post("/cart-items", response_model=CartItemOut, status_code=201)
-def add_to_cart(item: CartItemCreate, db: Session = Depends(get_db)):
-    cart_item = CartItem(**item.dict())
-    db.add(cart_item)
-    db.commit()
-    db.refresh(cart_item)
-    return cart_item
+def add_to_cart(item: CartItemCreate):
+    if item.quantity < 1:
+        raise HTTPException(status_code=400, detail="Quantity must be at least 1")
+    return cart_store.add(item.customer_id, item.product_id, item.quantity)
+
+# PATCH /cart-items — Sets the quantity of many cart lines in one request
+# Upserts every line with quantity > 0 in one statement and deletes lines set to 0 in another
+# Returns the customer's full cart after the change
+@router.patch("/cart-items", response_model=list[CartItemOut])
+def update_cart(patch: CartItemsPatch):
+    # Last entry wins when a product is listed more than once
+    quantities = {line.product_id: line.quantity for line in patch.items}
+    return cart_store.set_quantities(patch.customer_id, quantities)
 
 # GET /cart-items — Retrieves all cart items for a specific customer
 # Filters cart items by customer ID and returns complete list
 # Used to display customer's current shopping cart contents
 @router.get("/cart-items", response_model=list[CartItemOut])
-def get_cart(customer_id: int, db: Session = Depends(get_db)):
-    return db.query(CartItem).filter(CartItem.customer_id == customer_id).all()
+def get_cart(customer_id: int):
+    return cart_store.get_cart(customer_id)
+
+# GET /cart-items/summary — Returns the customer's cart priced and totalled in one response
+# Prices come from a short-TTL local cache, filled by one batched products-service lookup
+# Lines whose product left the catalog are marked unavailable and left out of the totals
+@router.get("/cart-items/summary", response_model=CartSummaryOut)
+async def get_cart_summary(customer_id: int):
+    items = await run_in_threadpool(cart_store.get_cart, customer_id)
+    prices = await get_prices(item.product_id for item in items)
+    if prices is None:
+        raise HTTPException(status_code=503, detail="Product service unavailable")
+
+    lines = []
+    subtotal = total = 0.0
+    item_count = 0
+    for item in items:
+        line = {"id": item.id, "product_id": item.product_id, "quantity": item.quantity, "available": False}
+        price = prices.get(item.product_id)
+        if price:
+            unit_price = round(price["list_price"] * (1 - price["discount_percent"] / 100), 2)
+            line.update(price, unit_price=unit_price, line_total=round(unit_price * item.quantity, 2), available=True)
+            subtotal += price["list_price"] * item.quantity
+            total += line["line_total"]
+            item_count += item.quantity
+        lines.append(line)
+
+    return {
+        "customer_id": customer_id,
+        "lines": lines,
+        "item_count": item_count,
+        "subtotal": round(subtotal, 2),
+        "discount_total": round(subtotal - total, 2),
+        "total": round(total, 2),
+    }
 
 # DELETE /cart-items/{item_id} — Removes specific item from shopping cart
-# Finds cart item by ID, deletes it from database if found
+# Finds cart item by ID and removes it from the customer's cart if found
 # Returns 404 error if item doesn't exist, 204 on successful deletion
 @router.delete("/cart-items/{item_id}", status_code=204)
-def remove_from_cart(item_id: int, db: Session = Depends(get_db)):
-    item = db.query(CartItem).filter(CartItem.id == item_id).first()
-    if not item:
+def remove_from_cart(item_id: int):
+    if not cart_store.remove_item(item_id):
         raise HTTPException(status_code=404, detail="Item not found")
-    db.delete(item)
-    db.commit()
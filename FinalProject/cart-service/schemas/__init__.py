@@ -1 +1 @@
-from .cart_item import CartItemOut, CartItemCreate
+from .cart_item import CartItemOut, CartItemCreate, CartLineUpdate, CartItemsPatch, CartLineSummary, CartSummaryOut
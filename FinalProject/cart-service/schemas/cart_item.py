@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -15,4 +15,31 @@ class CartItemOut(BaseModel):
     updated_at: Optional[datetime]
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+class CartLineUpdate(BaseModel):
+    product_id: int
+    quantity: int = Field(ge=0)  # 0 removes the line
+
+class CartItemsPatch(BaseModel):
+    customer_id: int
+    items: list[CartLineUpdate] = Field(min_length=1, max_length=500)
+
+class CartLineSummary(BaseModel):
+    id: int
+    product_id: int
+    quantity: int
+    product_name: Optional[str] = None
+    list_price: Optional[float] = None
+    discount_percent: Optional[float] = None
+    unit_price: Optional[float] = None
+    line_total: Optional[float] = None
+    available: bool  # False when the product is no longer in the catalog
+
+class CartSummaryOut(BaseModel):
+    customer_id: int
+    lines: list[CartLineSummary]
+    item_count: int
+    subtotal: float
+    discount_total: float
+    total: float
@@ -337,7 +337,7 @@ def delete_product(product_id):
   if click.confirm(f'Are you sure you want to delete product {product_id}?'):
     try:
       response = cli.admin_client.delete(f"/admin/products/{product_id}")
-      if response.status_code == 200:
+      if response.status_code in (200, 204):
         click.echo("✅ Product deleted successfully!")
       else:
         click.echo(f"❌ Failed to delete product: {response.status_code}")
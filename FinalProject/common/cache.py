@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+# Bounded in-process cache with least-recently-used eviction and per-entry expiry
+# Thread-safe so it can be shared by async handlers and threadpool (def) handlers alike
+# A maxsize of 0 disables caching entirely while keeping the same call sites
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    # Returns the cached value for key, or default when absent or expired
+    # Expired entries are dropped on read; hits move the key to the most-recent end
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    # Stores value under key for ttl seconds (the cache default when not given)
+    # Evicts least-recently-used entries once the cache is over maxsize
+    def set(self, key, value, ttl: float = None):
+        if not self.enabled:
+            return
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Snapshot of the counters for debug/metrics endpoints
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
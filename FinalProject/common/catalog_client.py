@@ -0,0 +1,45 @@
+import asyncio
+import os
+
+import httpx
+
+from common.http_client import get_http_client
+
+PRODUCTS_SERVICE_URL = os.getenv("PRODUCTS_SERVICE_URL", "http://products-service:8005")
+# products-service caps GET /products/batch at this many ids per call
+PRODUCT_BATCH_SIZE = int(os.getenv("PRODUCT_BATCH_SIZE", "200"))
+# Batch calls one request may have in flight at once, so a huge list can't flood products-service
+PRODUCT_FETCH_CONCURRENCY = int(os.getenv("PRODUCT_FETCH_CONCURRENCY", "4"))
+
+
+# Fetches many products through GET /products/batch, keyed by product_id
+# Ids are de-duplicated and split into PRODUCT_BATCH_SIZE chunks fetched concurrently (bounded)
+# Ids products-service doesn't know are simply absent from the result
+# Returns None if products-service is unreachable or answers with an error
+async def get_products_info(product_ids) -> dict | None:
+    unique_ids = list(dict.fromkeys(product_ids))
+    if not unique_ids:
+        return {}
+
+    chunks = [unique_ids[i:i + PRODUCT_BATCH_SIZE] for i in range(0, len(unique_ids), PRODUCT_BATCH_SIZE)]
+    client = get_http_client()
+    semaphore = asyncio.Semaphore(PRODUCT_FETCH_CONCURRENCY)
+
+    async def fetch(chunk):
+        async with semaphore:
+            return await client.get(
+                f"{PRODUCTS_SERVICE_URL}/products/batch", params={"ids": ",".join(map(str, chunk))}
+            )
+
+    try:
+        responses = await asyncio.gather(*[fetch(chunk) for chunk in chunks])
+    except httpx.RequestError:
+        return None
+
+    products = {}
+    for response in responses:
+        if response.status_code != 200:
+            return None
+        for product in response.json()["products"]:
+            products[product["product_id"]] = product
+    return products
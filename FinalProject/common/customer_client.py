@@ -0,0 +1,65 @@
+import os
+
+import httpx
+
+from common.cache import TTLCache
+from common.http_client import get_http_client
+
+CUSTOMER_SERVICE_URL = os.getenv("CUSTOMER_SERVICE_URL", "http://customer-service:8003")
+CUSTOMER_CACHE_SIZE = int(os.getenv("CUSTOMER_CACHE_SIZE", "10000"))
+CUSTOMER_CACHE_TTL = float(os.getenv("CUSTOMER_CACHE_TTL", "300"))
+# Unknown ids are remembered briefly so a newly registered customer is not rejected for long
+CUSTOMER_NEGATIVE_CACHE_SIZE = int(os.getenv("CUSTOMER_NEGATIVE_CACHE_SIZE", "1000"))
+CUSTOMER_NEGATIVE_CACHE_TTL = float(os.getenv("CUSTOMER_NEGATIVE_CACHE_TTL", "30"))
+
+# Per-process caches of customer-service answers, keyed by customer_id
+# Only definitive answers are stored: 200 in known_customers, 404 in unknown_customers
+known_customers = TTLCache(maxsize=CUSTOMER_CACHE_SIZE, ttl=CUSTOMER_CACHE_TTL)
+unknown_customers = TTLCache(maxsize=CUSTOMER_NEGATIVE_CACHE_SIZE, ttl=CUSTOMER_NEGATIVE_CACHE_TTL)
+
+
+# Checks that a customer exists, answering from the caches when possible
+# Network errors and 5xx responses return False without being cached
+async def validate_customer(customer_id: int) -> bool:
+    if known_customers.get(customer_id):
+        return True
+    if unknown_customers.get(customer_id):
+        return False
+
+    try:
+        response = await get_http_client().get(f"{CUSTOMER_SERVICE_URL}/customers/{customer_id}")
+    except httpx.RequestError:
+        return False
+
+    if response.status_code == 200:
+        unknown_customers.invalidate(customer_id)
+        known_customers.set(customer_id, True)
+        return True
+    if response.status_code == 404:
+        known_customers.invalidate(customer_id)
+        unknown_customers.set(customer_id, True)
+    return False
+
+
+# Forgets everything cached about one customer (or every customer when customer_id is None)
+def invalidate_customer(customer_id: int = None):
+    if customer_id is None:
+        known_customers.clear()
+        unknown_customers.clear()
+        return
+    known_customers.invalidate(customer_id)
+    unknown_customers.invalidate(customer_id)
+
+
+# Every check consults known_customers first, so its lookups are the total number of checks
+# hit_rate is the share of checks answered without calling customer-service
+def customer_cache_stats() -> dict:
+    positive, negative = known_customers.stats(), unknown_customers.stats()
+    checks = positive["hits"] + positive["misses"]
+    answered = positive["hits"] + negative["hits"]
+    return {
+        "checks": checks,
+        "hit_rate": round(answered / checks, 4) if checks else 0.0,
+        "positive": positive,
+        "negative": negative,
+    }
@@ -0,0 +1,116 @@
+import os
+import weakref
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+# Opt-in async engine mode: DB_ASYNC=true swaps each service's get_db for an AsyncSession
+# backed by a non-blocking driver, so queries no longer stall the uvicorn event loop
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Async driver used for each backend when DB_ASYNC is on
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+}
+
+# Connection pool settings shared by every service engine
+# Each uvicorn worker (WEB_CONCURRENCY) owns a separate pool, so DB_MAX_CONNECTIONS is the
+# per-service budget split across workers; DB_POOL_SIZE / DB_MAX_OVERFLOW override the split
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+_worker_share = max(2, DB_MAX_CONNECTIONS // WEB_CONCURRENCY)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(_worker_share // 2)))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(max(0, _worker_share - DB_POOL_SIZE))))
+# Recycle well below MySQL's wait_timeout so the server never closes a pooled connection first
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+# Sync engine -> the engine_options it was created with, reported by pool_status
+_engine_options = weakref.WeakKeyDictionary()
+
+
+# Engine keyword arguments for a DATABASE_URL with the configured pool settings
+# In-memory SQLite uses a single shared connection, which takes no size/overflow/timeout
+def engine_options(database_url: str, **overrides) -> dict:
+    options = {
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+    url = make_url(database_url)
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    options.update(overrides)
+    return options
+
+
+# Creates a service's sync engine with the shared pool settings
+# Keyword overrides are passed straight to create_engine (used by scripts and benchmarks)
+def create_db_engine(database_url: str, **overrides):
+    options = engine_options(database_url, **overrides)
+    engine = create_engine(database_url, **options)
+    _engine_options[engine] = options
+    return engine
+
+
+def create_session_factory(engine):
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+# Rewrites a sync DATABASE_URL (mysql+pymysql://, sqlite://) to its async-driver equivalent
+# Raises ValueError for backends without a known async driver
+def to_async_url(database_url: str) -> str:
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+# Creates the async engine and session factory for a service's DATABASE_URL
+# Imported lazily so services in sync mode don't need aiomysql/greenlet installed
+def create_async_session_factory(database_url: str, **overrides):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    options = engine_options(database_url, **overrides)
+    engine = create_async_engine(to_async_url(database_url), **options)
+    _engine_options[engine.sync_engine] = options
+    return engine, async_sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+# Snapshot of an engine's connection pool for the /debug/db-pool endpoints
+# Accepts sync or async engines; counters are per worker process. Settings are the options the
+# engine was created with (None for engines not made by create_db_engine/create_async_session_factory)
+def pool_status(engine) -> dict:
+    engine = getattr(engine, "sync_engine", engine)
+    pool = engine.pool
+    options = _engine_options.get(engine, {})
+    status = {
+        "pool": type(pool).__name__,
+        "pre_ping": options.get("pool_pre_ping"),
+        "recycle": options.get("pool_recycle"),
+    }
+    if hasattr(pool, "checkedout"):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=options.get("max_overflow"),
+            timeout=options.get("pool_timeout"),
+        )
+    return status
+
+
+# Runs a synchronous ORM function fn(session, *args) against whichever session get_db yielded
+# With an AsyncSession the function runs via run_sync, so its I/O awaits the async driver
+# instead of blocking the loop; with a plain Session it is simply called inline as before
+async def run_db(db, fn, *args, **kwargs):
+    if hasattr(db, "run_sync"):
+        return await db.run_sync(fn, *args, **kwargs)
+    return fn(db, *args, **kwargs)
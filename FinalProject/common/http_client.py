@@ -0,0 +1,84 @@
+import logging
+import os
+from contextlib import asynccontextmanager
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Connection pool and timeout settings shared by every outbound call a service makes
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "5"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "2"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+_client = None
+
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+# Falls back to HTTP/1.1 keep-alive with a warning instead of failing at startup
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP2_ENABLED is set but the h2 package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+# Outbound call counts and timings for /metrics, when prometheus_client is installed
+# Imported lazily so scripts that only need the client don't pull in the metrics module
+def _metrics_event_hooks() -> dict:
+    try:
+        from common.metrics import HTTP_CLIENT_EVENT_HOOKS
+    except ImportError:
+        return {}
+    return HTTP_CLIENT_EVENT_HOOKS
+
+
+# Builds an AsyncClient with the configured pool limits, keep-alive and timeouts
+# Keyword overrides are passed straight to httpx.AsyncClient (used by benchmarks)
+def create_http_client(**overrides) -> httpx.AsyncClient:
+    options = {
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        "http2": _http2_available(),
+        "event_hooks": _metrics_event_hooks(),
+    }
+    options.update(overrides)
+    return httpx.AsyncClient(**options)
+
+
+# Returns the process-wide pooled client, creating it on first use
+# Services open it in their lifespan; lazy creation keeps scripts and the CLI working
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# FastAPI lifespan that opens the shared client at startup and drains it at shutdown
+# Pass as FastAPI(lifespan=http_client_lifespan) in each service's main.py
+@asynccontextmanager
+async def http_client_lifespan(app):
+    get_http_client()
+    try:
+        yield
+    finally:
+        await close_http_client()
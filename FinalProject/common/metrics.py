@@ -0,0 +1,153 @@
+import os
+import time
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+
+# With several worker processes, point PROMETHEUS_MULTIPROC_DIR at an empty shared directory so
+# /metrics aggregates every worker instead of reporting whichever one answered the scrape
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+METRICS_PATH = "/metrics"
+
+# Label used for requests that matched no route, so unknown URLs can't blow up label cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled, by route template and status",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time from receiving a request to sending the last response byte",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled",
+    ["method"], multiprocess_mode="livesum",
+)
+DB_QUERIES = Counter(
+    "db_queries_total", "SQL statements executed, by statement type",
+    ["operation"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Time spent executing SQL statements, by statement type",
+    ["operation"], buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+HTTP_CLIENT_REQUESTS = Counter(
+    "http_client_requests_total", "Outbound HTTP calls made through the shared client",
+    ["method", "host", "status"],
+)
+HTTP_CLIENT_DURATION = Histogram(
+    "http_client_request_duration_seconds", "Time from sending an outbound request to receiving its headers",
+    ["method", "host"],
+)
+
+
+# Returns the route template (e.g. /products/{product_id}) matched for this request, prefix included
+# Newer FastAPI keeps included routers nested, so scope["route"] holds the path relative to the
+# router prefix and the full template is on the effective route context; older versions flatten
+# routes and scope["route"] already carries it
+def _route_template(scope) -> str:
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path_format", None) or getattr(scope.get("route"), "path", None)
+    if not path and scope.get("root_path"):
+        # Served by a mounted app such as StaticFiles, which sets root_path to the mount point
+        path = scope["root_path"] + "/{path}"
+    return path or UNMATCHED_ROUTE
+
+
+# Pure ASGI middleware (no BaseHTTPMiddleware) so streaming responses are not buffered
+# Counts and times every HTTP request by method, route template and status code; the
+# duration covers the whole response body, including StreamingResponse output
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            route = _route_template(scope)
+            HTTP_REQUESTS.labels(method, route, status).inc()
+            HTTP_REQUEST_DURATION.labels(method, route, status).observe(time.perf_counter() - started)
+
+
+# Times every statement an engine runs (async engines are instrumented through sync_engine)
+def instrument_engine(engine):
+    # Imported here so services without a database (admin-service) don't need SQLAlchemy
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if getattr(sync_engine, "_metrics_instrumented", False):
+        return
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERIES.labels(operation).inc()
+        DB_QUERY_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        # Failed statements never reach after_cursor_execute; drop their start time
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+    sync_engine._metrics_instrumented = True
+
+
+# httpx event hooks for the shared AsyncClient (see common/http_client.create_http_client)
+async def _on_client_request(request):
+    request.extensions["metrics_started"] = time.perf_counter()
+
+
+async def _on_client_response(response):
+    request = response.request
+    started = request.extensions.get("metrics_started")
+    host = request.url.host
+    HTTP_CLIENT_REQUESTS.labels(request.method, host, str(response.status_code)).inc()
+    if started is not None:
+        HTTP_CLIENT_DURATION.labels(request.method, host).observe(time.perf_counter() - started)
+
+
+HTTP_CLIENT_EVENT_HOOKS = {"request": [_on_client_request], "response": [_on_client_response]}
+
+
+def metrics_response() -> Response:
+    registry = REGISTRY
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+# Mounts the metrics middleware and GET /metrics on a service and times its database engines
+# Call once in each main.py after the app is created:
+#   setup_metrics(app, engines=[engine])
+def setup_metrics(app, engines=()):
+    app.add_middleware(MetricsMiddleware)
+    for engine in engines:
+        instrument_engine(engine)
+    app.add_api_route(METRICS_PATH, metrics_response, methods=["GET"], include_in_schema=False)
@@ -0,0 +1,39 @@
+import base64
+import binascii
+import json
+from fastapi import HTTPException, Response
+
+# Listing endpoints return the opaque token for the following page in this header,
+# leaving the JSON body a plain list so existing clients keep working
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# Encodes the sort key of the last row on a page into an opaque, URL-safe token
+# Clients pass it back untouched as ?cursor= to continue right after that row
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# Decodes a cursor produced by encode_cursor and checks it carries the expected keys
+# Raises a 400 error for tampered, truncated or foreign tokens
+def decode_cursor(cursor: str, *keys: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, dict) or any(key not in values for key in keys):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+# Trims the limit + 1 rows a keyset query fetched down to one page
+# Sets the next-cursor header from the last row kept when more rows remain
+# Returns the rows that belong to the current page
+def paginate(rows: list, limit: int, response: Response, cursor_for) -> list:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(cursor_for(rows[-1]))
+    return rows
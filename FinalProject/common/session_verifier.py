@@ -0,0 +1,78 @@
+import os
+import time
+
+from fastapi import Cookie, HTTPException
+from jose import JWTError, jwt
+
+from common.cache import TTLCache
+
+SESSION_COOKIE = "session"
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+# Upper bound for caching tokens; a token is never cached past its own exp claim
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "300"))
+
+
+class InvalidSession(Exception):
+    pass
+
+
+# Verifies auth-service session JWTs in-process with the shared SECRET_KEY / ALGORITHM
+# Verified claims are cached by token until the token expires, so repeat checks skip the
+# signature work; failed tokens are never cached so forged cookies can't fill the cache
+class SessionVerifier:
+    def __init__(self, secret_key: str, algorithm: str, cache_size: int = SESSION_CACHE_SIZE,
+                 cache_ttl: float = SESSION_CACHE_TTL, clock=time.time):
+        if not secret_key or not algorithm:
+            raise RuntimeError("SECRET_KEY and ALGORITHM must be set to verify sessions")
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.cache_ttl = cache_ttl
+        self._clock = clock
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    # Returns the token's claims, raising InvalidSession for bad signatures or expired tokens
+    def verify(self, token: str) -> dict:
+        claims = self._cache.get(token)
+        if claims is not None:
+            return claims
+
+        try:
+            claims = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except JWTError as e:
+            raise InvalidSession(str(e)) from e
+
+        ttl = self.cache_ttl
+        if "exp" in claims:
+            ttl = min(ttl, claims["exp"] - self._clock())
+        if ttl > 0:
+            self._cache.set(token, claims, ttl=ttl)
+        return claims
+
+    def invalidate(self, token: str):
+        self._cache.invalidate(token)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+_verifier = None
+
+
+# Returns the process-wide verifier built from the SECRET_KEY / ALGORITHM environment
+def get_session_verifier() -> SessionVerifier:
+    global _verifier
+    if _verifier is None:
+        _verifier = SessionVerifier(os.getenv("SECRET_KEY"), os.getenv("ALGORITHM"))
+    return _verifier
+
+
+# FastAPI dependency that rejects requests without a valid session cookie
+# Returns the token claims; protect a whole router with
+#   app.include_router(router, dependencies=[Depends(require_session)])
+async def require_session(session: str = Cookie(None)) -> dict:
+    if not session:
+        raise HTTPException(status_code=401, detail="Missing session cookie")
+    try:
+        return get_session_verifier().verify(session)
+    except InvalidSession:
+        raise HTTPException(status_code=401, detail="Invalid session token")
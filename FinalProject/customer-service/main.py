@@ -2,14 +2,25 @@ from fastapi import FastAPI
 from routers import customers
 from setup_models import setup_database
 from models.customers import Customer
-from models.database import get_db
+from models.database import engine, get_db
+from common.database import pool_status
+from common.metrics import setup_metrics
 
 setup_database()
 app = FastAPI()
 
+# GET /metrics — Prometheus request, database and outbound HTTP metrics for this service
+setup_metrics(app, engines=[engine])
+
 # Include customer routes
 app.include_router(customers.router, tags=["Customers"])
 
 @app.get("/health")
 def health_check():
     return {"service": "customer-service", "status": "healthy"}
+
+# GET /debug/db-pool — Reports this worker's database connection pool usage
+# Returns pool size, checked-out and overflow counts for tuning DB_POOL_SIZE / DB_MAX_OVERFLOW
+@app.get("/debug/db-pool")
+def db_pool_stats():
+    return pool_status(engine)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form, Response, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Response, Request, Query
 from passlib.context import CryptContext
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
@@ -7,6 +7,8 @@ from schemas import CustomerCreate, CustomerUpdate, CustomerOut, CustomerAuth
 from models.database import get_db
 from models.customers import Customer
 from pydantic import BaseModel, EmailStr
+from typing import Optional
+from common.pagination import decode_cursor, paginate
 
 router = APIRouter(prefix="/customers")
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -32,12 +34,22 @@ def create_customer(payload: CustomerCreate, db: Session = Depends(get_db)):
     return new_customer
 
 
-# GET /customers/ — Retrieves all customer records from the database
-# Returns complete list of customers with public-facing customer information
-# Used for administrative purposes to view all registered customers
+# GET /customers/ — Retrieves customer records one keyset page at a time
+# Returns up to limit customers ordered by ID with public-facing customer information
+# The cursor for the next page is sent in the X-Next-Cursor response header
 @router.get("/", response_model=list[CustomerOut])
-def get_customers(db: Session = Depends(get_db)):
-    return db.query(Customer).all()
+def get_customers(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    query = db.query(Customer)
+    if cursor:
+        query = query.filter(Customer.customer_id > decode_cursor(cursor, "id")["id"])
+
+    customers = query.order_by(Customer.customer_id).limit(limit + 1).all()
+    return paginate(customers, limit, response, lambda customer: {"id": customer.customer_id})
 
 # GET /customers/by-email — Finds customer by email address for authentication
 # Returns CustomerAuth schema with password for auth-service verification
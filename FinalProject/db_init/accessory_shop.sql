@@ -171,6 +171,7 @@ CREATE TABLE `products` (
   PRIMARY KEY (`product_id`),
   UNIQUE KEY `product_code` (`product_code`),
   KEY `products_fk_categories` (`category_id`),
+  FULLTEXT KEY `ft_products_name_description` (`product_name`,`description`),
   CONSTRAINT `products_fk_categories` FOREIGN KEY (`category_id`) REFERENCES `categories` (`category_id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=11 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -1,10 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import products, orders
+from models.database import engine
+from common.database import pool_status
+from common.metrics import setup_metrics
 
 
 app = FastAPI()
 
+# GET /metrics — Prometheus request, database and outbound HTTP metrics for this service
+setup_metrics(app, engines=[engine])
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:4000", "http://bff:4000"],
@@ -27,3 +33,9 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"service": "fastapi-main", "status": "healthy"}
+
+# GET /debug/db-pool — Reports this worker's database connection pool usage
+# Returns pool size, checked-out and overflow counts for tuning DB_POOL_SIZE / DB_MAX_OVERFLOW
+@app.get("/debug/db-pool")
+def db_pool_stats():
+    return pool_status(engine)
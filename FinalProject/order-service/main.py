@@ -2,9 +2,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import orders
 from setup_models import setup_database
+from common.http_client import http_client_lifespan
+from models import database
+from common.database import DB_ASYNC, pool_status
+from common.metrics import setup_metrics
+from common.customer_client import customer_cache_stats, invalidate_customer
 
 setup_database()
-app = FastAPI(title="Order Service", version="1.0.0")
+app = FastAPI(title="Order Service", version="1.0.0", lifespan=http_client_lifespan)
+
+# GET /metrics — Prometheus request, database and outbound HTTP metrics for this service
+setup_metrics(app, engines=[database.engine, database.async_engine] if DB_ASYNC else [database.engine])
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,3 +27,21 @@ app.include_router(orders.router, prefix="/orders", tags=["Orders"])
 @app.get("/health")
 def health_check():
     return {"service": "order-service", "status": "healthy"}
+
+# GET /debug/db-pool — Reports this worker's database connection pool usage
+# Returns pool size, checked-out and overflow counts for tuning DB_POOL_SIZE / DB_MAX_OVERFLOW
+@app.get("/debug/db-pool")
+def db_pool_stats():
+    return pool_status(database.async_engine if DB_ASYNC else database.engine)
+
+# GET /debug/customer-cache — Reports the customer-existence cache counters
+# Returns size, hit/miss counts and hit rate for the positive and negative caches in this worker
+@app.get("/debug/customer-cache")
+def customer_cache_info():
+    return customer_cache_stats()
+
+# DELETE /debug/customer-cache/{customer_id} — Drops cached answers for one customer
+# Lets customer-service or an operator force the next check to ask customer-service again
+@app.delete("/debug/customer-cache/{customer_id}", status_code=204)
+def invalidate_customer_cache(customer_id: int):
+    invalidate_customer(customer_id)
@@ -1,18 +1,25 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import create_engine
+from sqlalchemy.orm import declarative_base
+from common.database import DB_ASYNC, create_async_session_factory, create_db_engine, create_session_factory
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+engine = create_db_engine(DATABASE_URL)
+SessionLocal = create_session_factory(engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+if DB_ASYNC:
+    async_engine, AsyncSessionLocal = create_async_session_factory(DATABASE_URL)
+
+    async def get_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+else:
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, ForeignKey, Numeric
+from sqlalchemy.orm import relationship
 from .database import Base
 
 class OrderItem(Base):
@@ -10,3 +11,5 @@ class OrderItem(Base):
     item_price = Column(Numeric(10, 2), nullable=False)
     discount_amount = Column(Numeric(10, 2), nullable=False)
     quantity = Column(Integer, nullable=False)
+
+    order = relationship("Order", back_populates="items")
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Numeric, CHAR
+from sqlalchemy.orm import relationship
 from .database import Base
 
 class Order(Base):
@@ -15,3 +16,6 @@ class Order(Base):
     card_number = Column(CHAR(16), nullable=False)
     card_expires = Column(CHAR(7), nullable=False)
     billing_address_id = Column(Integer, nullable=False)
+
+    # Line items; load with selectinload(Order.items) so listings cost one extra query in total
+    items = relationship("OrderItem", back_populates="order", order_by="OrderItem.item_id", passive_deletes=True)
@@ -1,49 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import insert, select
 from models import get_db, Order, OrderItem
-from schemas import OrderCreate, OrderOut, OrderUpdate, OrderItemOut
+from schemas import OrderCreate, OrderOut, OrderUpdate
+from common.pagination import decode_cursor, paginate
+from common.catalog_client import get_products_info
+from common.customer_client import validate_customer
+from common.database import run_db
 from datetime import datetime
-import httpx
+from typing import Optional
+import asyncio
+import time
 
 router = APIRouter()
 
+# Accepted difference between a submitted item price and the catalog price
+PRICE_TOLERANCE = 0.01
 
-async def validate_customer(customer_id: int):
-  """Validate customer exists via customer service"""
-  try:
-    async with httpx.AsyncClient() as client:
-      response = await client.get(f"http://customer-service:8003/customers/{customer_id}")
-      return response.status_code == 200
-  except httpx.RequestError:
-    return False
+
+def price_matches(item_price: float, product: dict):
+  """Accept either the list price or the discounted price shown in the storefront"""
+  list_price = float(product["list_price"])
+  discounted = list_price * (1 - float(product.get("discount_percent") or 0) / 100)
+  return any(abs(item_price - price) <= PRICE_TOLERANCE for price in (list_price, discounted))
 
 
-async def get_product_info(product_id: int):
-  """Get product information from product service"""
+async def timed(timings: dict, phase: str, awaitable):
+  """Await a coroutine and record how long it took in milliseconds"""
+  start = time.perf_counter()
   try:
-    async with httpx.AsyncClient() as client:
-      response = await client.get(f"http://products-service:8005/products/{product_id}")
-      if response.status_code == 200:
-        return response.json()
-      return None
-  except httpx.RequestError:
-    return None
+    return await awaitable
+  finally:
+    timings[phase] = (time.perf_counter() - start) * 1000
 
 
-@router.post("/", response_model=OrderOut, status_code=status.HTTP_201_CREATED)
-async def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
-  # Validate customer exists
-  if not await validate_customer(order_data.customer_id):
-    raise HTTPException(status_code=400, detail="Customer not found")
+def server_timing(timings: dict):
+  """Format phase timings as a Server-Timing header value"""
+  return ", ".join(f"{phase};dur={duration:.1f}" for phase, duration in timings.items())
 
-  # Validate all products exist and get their info
-  for item in order_data.items:
-    product_info = await get_product_info(item.product_id)
-    if not product_info:
-      raise HTTPException(status_code=400, detail=f"Product {item.product_id} not found")
 
-  # Create order
+def insert_order_items(db: Session, order_id: int, item_rows: list[dict]):
+  """Bulk insert order items and return their ids in the same order as item_rows"""
+  statement = insert(OrderItem)
+  if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+    return db.scalars(statement.returning(OrderItem.item_id, sort_by_parameter_order=True), item_rows).all()
+
+  # MySQL has no RETURNING: auto-increment ids follow insertion order, so read them back in one query
+  db.execute(statement, item_rows)
+  return db.scalars(
+    select(OrderItem.item_id).where(OrderItem.order_id == order_id).order_by(OrderItem.item_id)
+  ).all()
+
+
+def write_order(db: Session, order_data: OrderCreate):
+  """Insert the order and its items in one transaction and return the OrderOut"""
   order = Order(
     customer_id=order_data.customer_id,
     order_date=datetime.now(),
@@ -56,72 +66,124 @@ async def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
     billing_address_id=order_data.billing_address_id
   )
 
-  db.add(order)
-  db.commit()
-  db.refresh(order)
-
-  # Create order items
-  order_items = []
-  for item_data in order_data.items:
-    order_item = OrderItem(
-      order_id=order.order_id,
-      product_id=item_data.product_id,
-      item_price=item_data.item_price,
-      discount_amount=item_data.discount_amount,
-      quantity=item_data.quantity
-    )
-    db.add(order_item)
-    order_items.append(order_item)
+  try:
+    # Flush (not commit) to get the order_id inside the still-open transaction
+    db.add(order)
+    db.flush()
+
+    # Insert every item in one executemany and collect the generated keys
+    item_rows = [
+      {
+        "order_id": order.order_id,
+        "product_id": item_data.product_id,
+        "item_price": item_data.item_price,
+        "discount_amount": item_data.discount_amount,
+        "quantity": item_data.quantity
+      }
+      for item_data in order_data.items
+    ]
+    # An empty executemany would become INSERT ... DEFAULT VALUES, so orders without items skip it
+    item_ids = insert_order_items(db, order.order_id, item_rows) if item_rows else []
+
+    # Build the response from values already in hand instead of re-reading rows
+    order_out = OrderOut.model_validate({
+      **{column.key: getattr(order, column.key) for column in Order.__table__.columns},
+      "items": [{"item_id": item_id, **row} for item_id, row in zip(item_ids, item_rows)]
+    })
+
+    db.commit()
+  except Exception:
+    db.rollback()
+    raise
 
-  db.commit()
+  return order_out
 
-  # Refresh items to get their IDs
-  for item in order_items:
-    db.refresh(item)
 
-  # Return order with items
-  order_out = OrderOut.from_orm(order)
-  order_out.items = [OrderItemOut.from_orm(item) for item in order_items]
+@router.post("/", response_model=OrderOut, status_code=status.HTTP_201_CREATED)
+async def create_order(order_data: OrderCreate, response: Response, db: Session = Depends(get_db)):
+  timings = {}
+  started = time.perf_counter()
+
+  # Validate the customer and every distinct product concurrently
+  product_ids = list(dict.fromkeys(item.product_id for item in order_data.items))
+  customer_ok, products = await asyncio.gather(
+    timed(timings, "customer", validate_customer(order_data.customer_id)),
+    timed(timings, "products", get_products_info(product_ids)),
+  )
+  timings["validate"] = (time.perf_counter() - started) * 1000
 
+  if not customer_ok:
+    raise HTTPException(status_code=400, detail="Customer not found")
+  if products is None:
+    raise HTTPException(status_code=503, detail="Product service unavailable")
+
+  # Check existence and price of each item against the fetched catalog data
+  for item in order_data.items:
+    product_info = products.get(item.product_id)
+    if not product_info:
+      raise HTTPException(status_code=400, detail=f"Product {item.product_id} not found")
+    if not price_matches(item.item_price, product_info):
+      raise HTTPException(status_code=400, detail=f"Price mismatch for product {item.product_id}")
+
+  write_started = time.perf_counter()
+
+  order_out = await run_db(db, write_order, order_data)
+
+  timings["write"] = (time.perf_counter() - write_started) * 1000
+  timings["total"] = (time.perf_counter() - started) * 1000
+  response.headers["Server-Timing"] = server_timing(timings)
   return order_out
 
 
 @router.get("/", response_model=list[OrderOut])
-async def get_orders(customer_id: int = None, db: Session = Depends(get_db)):
+async def get_orders(
+  response: Response,
+  customer_id: int = None,
+  limit: int = Query(100, ge=1, le=1000),
+  cursor: Optional[str] = Query(None),
+  db: Session = Depends(get_db)
+):
+  """List orders newest first; the next page's cursor is sent in the X-Next-Cursor header"""
+  orders = await run_db(db, list_orders, customer_id, limit, cursor)
+  return paginate(orders, limit, response, lambda order: {"id": order.order_id})
+
+
+def list_orders(db: Session, customer_id: Optional[int], limit: int, cursor: Optional[str]):
+  """Load up to limit + 1 orders after the cursor, with their items"""
   query = db.query(Order)
   if customer_id:
     query = query.filter(Order.customer_id == customer_id)
 
-  orders = query.all()
+  if cursor:
+    query = query.filter(Order.order_id < decode_cursor(cursor, "id")["id"])
 
-  # Get items for each order
-  result = []
-  for order in orders:
-    order_items = db.query(OrderItem).filter(OrderItem.order_id == order.order_id).all()
-    order_out = OrderOut.from_orm(order)
-    order_out.items = [OrderItemOut.from_orm(item) for item in order_items]
-    result.append(order_out)
-
-  return result
+  # Items for the whole page are fetched by one extra IN (...) query
+  orders = query.options(selectinload(Order.items)).order_by(Order.order_id.desc()).limit(limit + 1).all()
+  return [OrderOut.from_orm(order) for order in orders]
 
 
 @router.get("/{order_id}", response_model=OrderOut)
 async def get_order(order_id: int, db: Session = Depends(get_db)):
-  order = db.query(Order).filter(Order.order_id == order_id).first()
+  order = await run_db(db, load_order, order_id)
   if not order:
     raise HTTPException(status_code=404, detail="Order not found")
 
-  # Get order items
-  order_items = db.query(OrderItem).filter(OrderItem.order_id == order_id).all()
+  return order
 
-  order_out = OrderOut.from_orm(order)
-  order_out.items = [OrderItemOut.from_orm(item) for item in order_items]
 
-  return order_out
+def load_order(db: Session, order_id: int):
+  """Load one order with its items, or None"""
+  order = db.query(Order).options(selectinload(Order.items)).filter(Order.order_id == order_id).first()
+  return OrderOut.from_orm(order) if order else None
 
 
 @router.put("/{order_id}", response_model=OrderOut)
 async def update_order(order_id: int, order_update: OrderUpdate, db: Session = Depends(get_db)):
+  return await run_db(db, apply_order_update, order_id, order_update)
+
+
+def apply_order_update(db: Session, order_id: int, order_update: OrderUpdate):
+  """Apply a partial update and return the refreshed order"""
   order = db.query(Order).filter(Order.order_id == order_id).first()
   if not order:
     raise HTTPException(status_code=404, detail="Order not found")
@@ -130,19 +192,18 @@ async def update_order(order_id: int, order_update: OrderUpdate, db: Session = D
     setattr(order, key, value)
 
   db.commit()
-  db.refresh(order)
-
-  # Get order items
-  order_items = db.query(OrderItem).filter(OrderItem.order_id == order_id).all()
 
-  order_out = OrderOut.from_orm(order)
-  order_out.items = [OrderItemOut.from_orm(item) for item in order_items]
-
-  return order_out
+  # Reload the order with its items in two queries regardless of item count
+  return load_order(db, order_id)
 
 
 @router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_order(order_id: int, db: Session = Depends(get_db)):
+  await run_db(db, remove_order, order_id)
+
+
+def remove_order(db: Session, order_id: int):
+  """Delete an order and its items"""
   order = db.query(Order).filter(Order.order_id == order_id).first()
   if not order:
     raise HTTPException(status_code=404, detail="Order not found")
@@ -156,9 +217,15 @@ async def delete_order(order_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/customer/{customer_id}/orders", response_model=list[OrderOut])
-async def get_customer_orders(customer_id: int, db: Session = Depends(get_db)):
+async def get_customer_orders(
+  customer_id: int,
+  response: Response,
+  limit: int = Query(100, ge=1, le=1000),
+  cursor: Optional[str] = Query(None),
+  db: Session = Depends(get_db)
+):
   # Validate customer exists
   if not await validate_customer(customer_id):
     raise HTTPException(status_code=404, detail="Customer not found")
 
-  return await get_orders(customer_id=customer_id, db=db)
+  return await get_orders(response=response, customer_id=customer_id, limit=limit, cursor=cursor, db=db)
@@ -0,0 +1,24 @@
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# In-process cache of serialized GET /products/{product_id} payloads (0 disables it)
+PRODUCT_CACHE_SIZE = int(os.getenv("PRODUCT_CACHE_SIZE", "1000"))
+PRODUCT_CACHE_TTL = float(os.getenv("PRODUCT_CACHE_TTL", "300"))
+
+# Upper bound on ids accepted by GET /products/batch in a single call
+PRODUCT_BATCH_MAX = int(os.getenv("PRODUCT_BATCH_MAX", "200"))
+
+# Conditional GET: list ETags roll over at least this often (seconds), and Cache-Control per endpoint
+CATALOG_ETAG_TTL = float(os.getenv("CATALOG_ETAG_TTL", "60"))
+PRODUCT_LIST_CACHE_CONTROL = os.getenv("PRODUCT_LIST_CACHE_CONTROL", "public, max-age=30")
+PRODUCT_CACHE_CONTROL = os.getenv("PRODUCT_CACHE_CONTROL", "public, max-age=60")
+CATEGORY_CACHE_CONTROL = os.getenv("CATEGORY_CACHE_CONTROL", "public, max-age=300")
+
+# GET /products/export: rows per server-side cursor fetch, which is also the size of each streamed chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# POST /products/import: rows per executemany INSERT, and how many row errors the report lists
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
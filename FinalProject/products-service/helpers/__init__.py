@@ -0,0 +1,5 @@
+from .search import apply_search, ensure_search_index, SEARCH_MODES
+from .product_cache import product_cache, serialize_product
+from .catalog_version import catalog_version, payload_etag, etag_matches, not_modified
+from .export import stream_catalog, EXPORT_FORMATS, EXPORT_COLUMNS
+from .product_import import import_products, iter_body_chunks, parse_import_rows, parse_import_stream, IMPORT_FORMATS
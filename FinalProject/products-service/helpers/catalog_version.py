@@ -0,0 +1,48 @@
+import hashlib
+import threading
+import time
+import uuid
+from fastapi import Response
+from config import CATALOG_ETAG_TTL
+
+
+# Version counter for ETags on catalog list endpoints (GET /products, GET /categories)
+# Every catalog write in this worker bumps it; the ETag also carries a per-process boot id, so a
+# restarted worker never reuses an old tag, and a time epoch that rolls every CATALOG_ETAG_TTL
+# seconds, which bounds how long a write made through another worker can go unnoticed
+class CatalogVersion:
+  def __init__(self, ttl: float, clock=time.time):
+    self.boot_id = uuid.uuid4().hex[:8]
+    self.counter = 0
+    self.ttl = ttl
+    self._clock = clock
+    self._lock = threading.Lock()
+
+  def bump(self):
+    with self._lock:
+      self.counter += 1
+
+  def etag(self) -> str:
+    epoch = int(self._clock() // self.ttl) if self.ttl > 0 else 0
+    return f'"{self.boot_id}-{self.counter}-{epoch}"'
+
+
+catalog_version = CatalogVersion(CATALOG_ETAG_TTL)
+
+
+# Strong ETag for a serialized payload (used for single products, which are cached as bytes)
+def payload_etag(payload: bytes) -> str:
+  return '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+
+
+# True when an If-None-Match header lists etag (or is "*"); weak W/ prefixes are ignored
+def etag_matches(if_none_match, etag: str) -> bool:
+  if not isinstance(if_none_match, str) or not if_none_match:
+    return False
+  if if_none_match.strip() == "*":
+    return True
+  return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+  return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from sqlalchemy import select
+from models import Product, Category
+from models.database import SessionLocal
+from config import EXPORT_BATCH_SIZE
+
+EXPORT_FORMATS = {
+  "ndjson": "application/x-ndjson",
+  "csv": "text/csv",
+}
+# Column order of an export row (and of the CSV header)
+EXPORT_COLUMNS = [
+  "product_id", "product_code", "product_name", "description", "list_price", "discount_percent",
+  "category_id", "category_name", "date_added", "image_url",
+]
+
+
+def _export_query(category_id=None):
+  query = select(
+    Product.product_id, Product.product_code, Product.product_name, Product.description,
+    Product.list_price, Product.discount_percent, Product.category_id, Category.category_name,
+    Product.date_added, Product.image_url,
+  ).join(Category, Category.category_id == Product.category_id).order_by(Product.product_id)
+  if category_id:
+    query = query.where(Product.category_id == category_id)
+  return query
+
+
+def _plain(value):
+  # Decimal prices and datetimes become JSON/CSV friendly strings, None stays None
+  if value is None or isinstance(value, (int, str)):
+    return value
+  return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+# Yields the export as encoded chunks of EXPORT_BATCH_SIZE rows, for a StreamingResponse
+# Opens its own session (the request's get_db session is closed before streaming finishes) and reads
+# through a server-side cursor with yield_per, so only one batch of rows is in memory at a time
+def stream_catalog(export_format: str, category_id=None):
+  with SessionLocal() as db:
+    result = db.execute(
+      _export_query(category_id).execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    if export_format == "csv":
+      buffer = io.StringIO()
+      writer = csv.writer(buffer)
+      writer.writerow(EXPORT_COLUMNS)
+      for partition in result.partitions():
+        writer.writerows([_plain(value) for value in row] for row in partition)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+      if buffer.tell():
+        yield buffer.getvalue().encode()
+      return
+
+    for partition in result.partitions():
+      yield "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, map(_plain, row)))) + "\n" for row in partition
+      ).encode()
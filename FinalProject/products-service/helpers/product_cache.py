@@ -0,0 +1,13 @@
+from common.cache import TTLCache
+from config import PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL
+from schemas import ProductOut
+
+# Serialized ProductOut JSON keyed by product_id, shared by every request in this worker
+# Writes in this process invalidate entries directly; other workers rely on the TTL
+product_cache = TTLCache(maxsize=PRODUCT_CACHE_SIZE, ttl=PRODUCT_CACHE_TTL)
+
+
+# Serializes a Product (with its category loaded) to the JSON bytes returned by the API
+# Used both to fill the cache and to answer cache misses so both paths are byte-identical
+def serialize_product(product) -> bytes:
+  return ProductOut.model_validate(product).model_dump_json().encode()
@@ -0,0 +1,222 @@
+import codecs
+import csv
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+from anyio import from_thread
+from pydantic import Field, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from models import Product, Category
+from models.database import SessionLocal
+from schemas import ProductCreate
+from config import IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+# An import row: like ProductCreate, but the code may be left blank for auto-generation and the
+# category may be given by name, so a GET /products/export file can be imported as-is
+# Codes are capped at the column width so an over-long one fails its row, not the whole insert
+class ProductImportRow(ProductCreate):
+  category_id: Optional[int] = None
+  product_code: str = Field("", max_length=10)
+  category_name: Optional[str] = None
+
+
+# Yields the request body chunks from inside a worker thread, waiting on the event loop for each
+# one, so the import can parse and insert while the rest of the upload is still arriving
+def iter_body_chunks(request):
+  stream = request.stream()
+  while True:
+    try:
+      yield from_thread.run(stream.__anext__)
+    except StopAsyncIteration:
+      return
+
+
+# Decodes UTF-8 byte chunks incrementally and yields complete lines, each ending in "\n" except
+# possibly the last; only the line being assembled is held in memory
+def _iter_lines(chunks):
+  decoder = codecs.getincrementaldecoder("utf-8-sig")()
+  partial = []
+  for chunk in chunks:
+    lines = decoder.decode(chunk).split("\n")
+    if len(lines) > 1:
+      partial.append(lines[0])
+      yield "".join(partial) + "\n"
+      for line in lines[1:-1]:
+        yield line + "\n"
+      partial = []
+    partial.append(lines[-1])
+  partial.append(decoder.decode(b"", final=True))
+  tail = "".join(partial)
+  if tail:
+    yield tail
+
+
+# Parses NDJSON or CSV byte chunks into (row_number, fields) pairs as they arrive; row numbers count
+# data rows from 1. Blank CSV cells are dropped so schema defaults apply; unparseable NDJSON lines
+# yield an error string. Raises UnicodeDecodeError when the body is not UTF-8.
+def parse_import_stream(chunks, import_format: str):
+  if import_format == "csv":
+    for number, record in enumerate(csv.DictReader(_iter_lines(chunks)), start=1):
+      yield number, {key: value for key, value in record.items() if key and value not in (None, "")}
+    return
+
+  number = 0
+  for line in _iter_lines(chunks):
+    if not line.strip():
+      continue
+    number += 1
+    try:
+      fields = json.loads(line)
+    except ValueError as e:
+      yield number, f"Invalid JSON: {e}"
+      continue
+    yield number, fields if isinstance(fields, dict) else "Each line must be a JSON object"
+
+
+# parse_import_stream for a body that is already in memory
+def parse_import_rows(body: bytes, import_format: str):
+  return parse_import_stream([body], import_format)
+
+
+def _validation_detail(error: ValidationError) -> str:
+  return "; ".join(
+    f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+  )
+
+
+# Generates count product codes (same format as the single-product route) not used in the table
+# or in taken (casefolded codes); collisions are re-drawn with one IN (...) query per round
+# instead of one per code. The casefolds of the returned codes are added to taken.
+def allocate_product_codes(db, count: int, taken: set) -> list[str]:
+  codes = []
+  while len(codes) < count:
+    candidates = {str(uuid.uuid4())[:8].upper() for _ in range(count - len(codes))}
+    candidates = {code for code in candidates if code.casefold() not in taken}
+    existing = {
+      code.casefold() for code in db.scalars(select(Product.product_code).where(Product.product_code.in_(candidates)))
+    }
+    codes.extend(code for code in candidates if code.casefold() not in existing)
+    taken |= {code.casefold() for code in candidates}
+  return codes
+
+
+class ImportReport:
+  def __init__(self):
+    self.received = 0
+    self.imported = 0
+    self.failed = 0
+    self.errors = []
+    self.started = time.perf_counter()
+
+  def error(self, row: int, detail: str):
+    self.failed += 1
+    if len(self.errors) < IMPORT_MAX_ERRORS:
+      self.errors.append({"row": row, "detail": detail})
+
+  def as_dict(self) -> dict:
+    elapsed = time.perf_counter() - self.started
+    return {
+      "received": self.received,
+      "imported": self.imported,
+      "failed": self.failed,
+      "errors": sorted(self.errors, key=lambda error: error["row"]),
+      "errors_truncated": self.failed > len(self.errors),
+      "elapsed_ms": round(elapsed * 1000, 1),
+      "rows_per_second": round(self.imported / elapsed) if elapsed > 0 else 0,
+    }
+
+
+# Inserts one chunk's rows inside a savepoint; if the database rejects the chunk (e.g. a code
+# taken by a concurrent writer), retries its rows one by one so only the offending rows fail
+def _insert_chunk(db, numbered_values: list, report: ImportReport):
+  try:
+    with db.begin_nested():
+      db.execute(insert(Product), [product for _, product in numbered_values])
+    report.imported += len(numbered_values)
+    return
+  except IntegrityError:
+    pass
+
+  for number, product in numbered_values:
+    try:
+      with db.begin_nested():
+        db.execute(insert(Product), [product])
+      report.imported += 1
+    except IntegrityError as e:
+      report.error(number, f"Database rejected row: {e.orig}")
+
+
+# Validates and inserts products from parse_import_stream in chunks of IMPORT_BATCH_SIZE
+# Categories are loaded with one query; per chunk there is one lookup of already-used codes, one
+# batched code allocation for blank codes and one executemany INSERT in a savepoint. Codes are
+# compared casefolded, as the product_code collation does. Invalid rows are skipped and reported;
+# valid rows are committed in one transaction at the end. Runs in a worker thread with its own
+# session, pulling rows as the body arrives, so neither the file nor its rows are held in memory.
+def import_products(rows, session_factory=SessionLocal) -> dict:
+  report = ImportReport()
+  with session_factory() as db:
+    categories = dict(db.execute(select(Category.category_id, Category.category_name)).all())
+    category_ids = {name.lower(): category_id for category_id, name in categories.items()}
+    seen_codes = set()
+
+    def flush(chunk):
+      # chunk: [(row_number, ProductImportRow)]
+      codes = [row.product_code for _, row in chunk if row.product_code]
+      used = {
+        code.casefold() for code in db.scalars(select(Product.product_code).where(Product.product_code.in_(codes)))
+      } if codes else set()
+
+      accepted = []
+      for number, row in chunk:
+        code = row.product_code.casefold()
+        if code and code in seen_codes:
+          report.error(number, "Duplicate product code in import")
+        elif code in used:
+          report.error(number, "Product code already exists")
+        else:
+          seen_codes.add(code)
+          accepted.append((number, row))
+
+      generated = iter(allocate_product_codes(db, sum(1 for _, row in accepted if not row.product_code), seen_codes))
+      now = datetime.now()
+      values = []
+      for number, row in accepted:
+        product = row.model_dump(exclude={"category_name"})
+        product["product_code"] = row.product_code or next(generated)
+        product["date_added"] = product["date_added"] or now
+        values.append((number, product))
+      if values:
+        _insert_chunk(db, values, report)
+
+    chunk = []
+    for number, fields in rows:
+      report.received += 1
+      if isinstance(fields, str):
+        report.error(number, fields)
+        continue
+      try:
+        row = ProductImportRow.model_validate(fields)
+      except ValidationError as e:
+        report.error(number, _validation_detail(e))
+        continue
+
+      if row.category_id is None and row.category_name:
+        row.category_id = category_ids.get(row.category_name.lower())
+      if row.category_id not in categories:
+        report.error(number, "Category not found")
+        continue
+
+      chunk.append((number, row))
+      if len(chunk) >= IMPORT_BATCH_SIZE:
+        flush(chunk)
+        chunk = []
+    if chunk:
+      flush(chunk)
+    db.commit()
+  return report.as_dict()
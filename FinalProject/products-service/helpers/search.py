@@ -0,0 +1,105 @@
+import logging
+import re
+from sqlalchemy import and_, case, inspect, or_, text
+from sqlalchemy.dialects.mysql import match
+from models import Product
+
+SEARCH_MODES = ("fulltext", "like")
+FULLTEXT_INDEX_NAME = "ft_products_name_description"
+
+logger = logging.getLogger(__name__)
+
+# InnoDB defaults: tokens shorter than innodb_ft_min_token_size and the built-in
+# stopword list are never indexed, so requiring them in BOOLEAN MODE matches nothing
+MIN_TOKEN_LENGTH = 3
+MAX_SEARCH_TOKENS = 8
+INNODB_STOPWORDS = {
+  "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for", "from",
+  "how", "i", "in", "is", "it", "la", "of", "on", "or", "that", "the", "this", "to",
+  "was", "what", "when", "where", "who", "will", "with", "und", "www",
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+# Splits a raw search string into unique lowercase word tokens, skipping stopwords
+# Punctuation and boolean-mode operators are dropped so user input can never alter the query
+# Caps the token count to keep the generated WHERE clause bounded
+def tokenize_search(search: str):
+  tokens = []
+  for token in _TOKEN_PATTERN.findall(search.lower()):
+    if token not in tokens and token not in INNODB_STOPWORDS:
+      tokens.append(token)
+  return tokens[:MAX_SEARCH_TOKENS]
+
+
+# Builds a portable "token appears in name or description" filter and relevance score
+# Used as the SQLite fallback and for tokens the MySQL FULLTEXT index cannot see
+# Name hits weigh twice as much as description hits so titles rank first
+def _like_terms(tokens):
+  filters = []
+  score = None
+  for token in tokens:
+    pattern = f"%{token}%"
+    in_name = Product.product_name.ilike(pattern)
+    in_description = Product.description.ilike(pattern)
+    filters.append(or_(in_name, in_description))
+    token_score = case((in_name, 2), else_=0) + case((in_description, 1), else_=0)
+    score = token_score if score is None else score + token_score
+  return filters, score
+
+
+# Applies the requested search mode to a products query
+# "like" keeps the original substring scan; "fulltext" tokenizes and ranks by relevance,
+# using MATCH ... AGAINST on MySQL and a LIKE-per-token fallback on other dialects
+# Returns the filtered query and a score expression to order by (None when unranked)
+def apply_search(query, search: str, mode: str, dialect_name: str):
+  if mode == "like":
+    return query.filter(
+      Product.product_name.contains(search) |
+      Product.description.contains(search)
+    ), None
+
+  tokens = tokenize_search(search)
+  if not tokens:
+    return apply_search(query, search, "like", dialect_name)
+
+  if dialect_name != "mysql":
+    filters, score = _like_terms(tokens)
+    return query.filter(and_(*filters)), score
+
+  indexed = [t for t in tokens if len(t) >= MIN_TOKEN_LENGTH]
+  unindexed = [t for t in tokens if len(t) < MIN_TOKEN_LENGTH]
+
+  score = None
+  if indexed:
+    score = match(
+      Product.product_name, Product.description,
+      against=" ".join(f"+{token}*" for token in indexed)
+    ).in_boolean_mode()
+    query = query.filter(score > 0)
+
+  if unindexed:
+    filters, like_score = _like_terms(unindexed)
+    query = query.filter(and_(*filters))
+    score = like_score if score is None else score + like_score
+
+  return query, score
+
+
+# Creates the FULLTEXT index on databases that were initialised before it existed
+# create_all() only creates missing tables, so older MySQL volumes need this one-off ALTER
+# No-op on other dialects, which use the LIKE fallback instead
+def ensure_search_index(engine):
+  if engine.dialect.name != "mysql":
+    return
+
+  existing = {index["name"] for index in inspect(engine).get_indexes("products")}
+  if FULLTEXT_INDEX_NAME in existing:
+    return
+
+  with engine.begin() as conn:
+    conn.execute(text(
+      f"ALTER TABLE products ADD FULLTEXT INDEX {FULLTEXT_INDEX_NAME} (product_name, description)"
+    ))
+  logger.info("Products search index created")
@@ -2,10 +2,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import products, categories
 from setup_models import setup_database
+from helpers import product_cache
+from models import database
+from common.database import DB_ASYNC, pool_status
+from common.metrics import setup_metrics
 
 setup_database()
 app = FastAPI(title="Products Service", version="1.0.0")
 
+# GET /metrics — Prometheus request, database and outbound HTTP metrics for this service
+setup_metrics(app, engines=[database.engine, database.async_engine] if DB_ASYNC else [database.engine])
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:4000"],
@@ -22,3 +29,15 @@ app.include_router(categories.router, prefix="/categories", tags=["Categories"])
 @app.get("/health")
 def health_check():
     return {"service": "products-service", "status": "healthy"}
+
+# GET /debug/product-cache — Reports the in-process product cache counters
+# Returns size, hit/miss counts and hit rate for this worker's GET /products/{product_id} cache
+@app.get("/debug/product-cache")
+def product_cache_stats():
+    return product_cache.stats()
+
+# GET /debug/db-pool — Reports this worker's database connection pool usage
+# Returns pool size, checked-out and overflow counts for tuning DB_POOL_SIZE / DB_MAX_OVERFLOW
+@app.get("/debug/db-pool")
+def db_pool_stats():
+    return pool_status(database.async_engine if DB_ASYNC else database.engine)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -15,5 +15,12 @@ class Product(Base):
     date_added = Column(DateTime)
     image_url = Column(String(500))
 
+    # FULLTEXT index backing relevance-ranked search (MySQL only)
+    __table_args__ = (
+        Index(
+            "ft_products_name_description", "product_name", "description", mysql_prefix="FULLTEXT"
+        ).ddl_if(dialect="mysql"),
+    )
+
     # Relationship to category
     category = relationship("Category", back_populates="products")
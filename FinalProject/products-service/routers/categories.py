@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
 from sqlalchemy.orm import Session
 from models import get_db, Category
 from schemas import CategoryCreate, CategoryOut
+from common.database import run_db
+from helpers import catalog_version, etag_matches, not_modified
+from config import CATEGORY_CACHE_CONTROL
+from typing import Optional
 
 router = APIRouter()
 
@@ -11,6 +15,13 @@ router = APIRouter()
 # Returns created category or raises 400 error if name already exists
 @router.post("/", response_model=CategoryOut, status_code=status.HTTP_201_CREATED)
 async def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
+  created = await run_db(db, insert_category, category)
+  catalog_version.bump()
+  return created
+
+
+# Database half of create_category, run through run_db so it works with sync and async sessions
+def insert_category(db: Session, category: CategoryCreate):
   # Check if category name already exists
   existing = db.query(Category).filter(Category.category_name == category.category_name).first()
   if existing:
@@ -20,15 +31,26 @@ async def create_category(category: CategoryCreate, db: Session = Depends(get_db
   db.add(new_category)
   db.commit()
   db.refresh(new_category)
-  return new_category
+  return CategoryOut.model_validate(new_category)
 
 
 # GET /categories/ — Retrieves all product categories from the database
 # Returns complete list of categories for product organization and filtering
-# Used by admin interface and product browsing functionality
+# Used by admin interface and product browsing functionality; 304 on a matching catalog-version ETag
 @router.get("/", response_model=list[CategoryOut])
-async def get_categories(db: Session = Depends(get_db)):
-  return db.query(Category).all()
+async def get_categories(
+  response: Response, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)
+):
+  etag = catalog_version.etag()
+  if etag_matches(if_none_match, etag):
+    return not_modified(etag, CATEGORY_CACHE_CONTROL)
+  response.headers["ETag"] = etag
+  response.headers["Cache-Control"] = CATEGORY_CACHE_CONTROL
+  return await run_db(db, list_categories)
+
+
+def list_categories(db: Session):
+  return [CategoryOut.model_validate(category) for category in db.query(Category).all()]
 
 
 # GET /categories/{category_id} — Retrieves specific category by ID
@@ -36,7 +58,7 @@ async def get_categories(db: Session = Depends(get_db)):
 # Raises 404 error if category doesn't exist
 @router.get("/{category_id}", response_model=CategoryOut)
 async def get_category(category_id: int, db: Session = Depends(get_db)):
-  category = db.query(Category).filter(Category.category_id == category_id).first()
+  category = await run_db(db, lambda db: db.query(Category).filter(Category.category_id == category_id).first())
   if not category:
     raise HTTPException(status_code=404, detail="Category not found")
   return category
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from models import get_db, Product, Category
-from schemas import ProductCreate, ProductOut, ProductUpdate
+from schemas import ProductCreate, ProductOut, ProductUpdate, ProductBatchOut
+from helpers import apply_search, SEARCH_MODES, product_cache, serialize_product
+from helpers import catalog_version, payload_etag, etag_matches, not_modified
+from helpers import stream_catalog, EXPORT_FORMATS, import_products, iter_body_chunks, parse_import_stream, IMPORT_FORMATS
+from common.pagination import decode_cursor, paginate
+from common.database import run_db
+from config import PRODUCT_BATCH_MAX, PRODUCT_LIST_CACHE_CONTROL, PRODUCT_CACHE_CONTROL
 from datetime import datetime
 from typing import Optional
+import json
 import uuid
 
 router = APIRouter()
@@ -22,6 +31,13 @@ def generate_product_code():
 # Creates Product record with current timestamp and returns product with category details
 @router.post("/", response_model=ProductOut, status_code=status.HTTP_201_CREATED)
 async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
+  created = await run_db(db, insert_product, product)
+  catalog_version.bump()
+  return created
+
+
+# Database half of create_product, run through run_db so it works with sync and async sessions
+def insert_product(db: Session, product: ProductCreate):
   # Check if category exists
   category = db.query(Category).filter(Category.category_id == product.category_id).first()
   if not category:
@@ -53,33 +69,77 @@ async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
   # Load with category relationship
   product_with_category = db.query(Product).options(joinedload(Product.category)).filter(
     Product.product_id == new_product.product_id).first()
-  return product_with_category
+  return ProductOut.model_validate(product_with_category)
+
+
+# POST /products/import — Bulk-creates products from an NDJSON or CSV request body
+# Checks categories with one lookup, allocates missing codes in batch and inserts in executemany chunks
+# The body is parsed and inserted as it streams in; returns counts, per-row errors (row numbers count
+# data rows from 1) and the import rate. Bad rows are skipped; a non-UTF-8 body rolls back the whole import
+@router.post("/import")
+async def import_product_file(request: Request, format: str = Query("ndjson", pattern=f"^({'|'.join(IMPORT_FORMATS)})$")):
+  rows = parse_import_stream(iter_body_chunks(request), format)
+  try:
+    report = await run_in_threadpool(import_products, rows)
+  except UnicodeDecodeError:
+    raise HTTPException(status_code=400, detail="Import file must be UTF-8 encoded")
+  if report["imported"]:
+    catalog_version.bump()
+  return report
 
 
 # GET /products/ — Retrieves products with optional filtering and pagination
-# Supports filtering by category, search terms, price range with skip/limit pagination
-# Returns products with category details loaded for comprehensive product information
+# Supports filtering by category, search terms, price range with cursor (or legacy skip) pagination
+# search_mode=like (default) keeps the substring scan, search_mode=fulltext ranks tokenized matches by relevance
+# Returns products with category details; the next page's cursor is sent in the X-Next-Cursor header
+# ETag comes from the catalog version, so a matching If-None-Match gets 304 before any query runs
 @router.get("", response_model=list[ProductOut])  # no slash
 @router.get("/", response_model=list[ProductOut])  # slash version
 async def get_products(
+  response: Response,
   category_id: Optional[int] = Query(None),
   search: Optional[str] = Query(None),
+  search_mode: str = Query("like", pattern=f"^({'|'.join(SEARCH_MODES)})$"),
   min_price: Optional[float] = Query(None),
   max_price: Optional[float] = Query(None),
   skip: int = Query(0, ge=0),
   limit: int = Query(100, ge=1, le=1000),
+  cursor: Optional[str] = Query(None),
+  if_none_match: Optional[str] = Header(None),
   db: Session = Depends(get_db)
 ):
+  if cursor and skip:
+    raise HTTPException(status_code=400, detail="Use either skip or cursor, not both")
+
+  # Taken before querying: a write racing the query only makes the tag older, never wrongly current
+  etag = catalog_version.etag()
+  if etag_matches(if_none_match, etag):
+    return not_modified(etag, PRODUCT_LIST_CACHE_CONTROL)
+  response.headers["ETag"] = etag
+  response.headers["Cache-Control"] = PRODUCT_LIST_CACHE_CONTROL
+
+  rows, ranked = await run_db(
+    db, query_products, category_id, search, search_mode, min_price, max_price, skip, limit, cursor
+  )
+
+  if ranked:
+    page = paginate(rows, limit, response, lambda row: {"score": row[1], "id": row[0].product_id})
+    return [product for product, _ in page]
+  return paginate(rows, limit, response, lambda product: {"id": product.product_id})
+
+
+# Builds and runs the filtered, keyset-ordered products query for get_products
+# Fetches limit + 1 rows so the caller can tell whether another page exists
+# Returns (rows, ranked): rows are ProductOut, or (ProductOut, score) pairs when ranked by relevance
+def query_products(db: Session, category_id, search, search_mode, min_price, max_price, skip, limit, cursor):
   query = db.query(Product).options(joinedload(Product.category))
 
   if category_id:
     query = query.filter(Product.category_id == category_id)
 
+  score = None
   if search:
-    query = query.filter(
-      Product.product_name.contains(search) |
-      Product.description.contains(search)
-    )
+    query, score = apply_search(query, search, search_mode, db.get_bind().dialect.name)
 
   if min_price is not None:
     query = query.filter(Product.list_price >= min_price)
@@ -87,18 +147,119 @@ async def get_products(
   if max_price is not None:
     query = query.filter(Product.list_price <= max_price)
 
-  return query.offset(skip).limit(limit).all()
+  # Keyset pagination: continue strictly after the (score, product_id) of the previous page's last row
+  if score is not None:
+    query = query.add_columns(score.label("search_score"))
+    if cursor:
+      after = decode_cursor(cursor, "score", "id")
+      query = query.filter(
+        (score < after["score"]) |
+        ((score == after["score"]) & (Product.product_id > after["id"]))
+      )
+    query = query.order_by(score.desc(), Product.product_id)
+  else:
+    if cursor:
+      after = decode_cursor(cursor, "id")
+      query = query.filter(Product.product_id > after["id"])
+    query = query.order_by(Product.product_id)
+
+  rows = query.offset(skip).limit(limit + 1).all()
+
+  if score is not None:
+    return [(ProductOut.model_validate(row[0]), row.search_score) for row in rows], True
+  return [ProductOut.model_validate(product) for product in rows], False
+
+
+# Parses ?ids=1,2,3 and/or repeated ?ids= values into unique product IDs, keeping request order
+# Raises 400 error for non-integer IDs, an empty list, or more IDs than PRODUCT_BATCH_MAX
+def parse_batch_ids(raw_ids: list[str]):
+  product_ids = []
+  for value in raw_ids:
+    for part in value.split(","):
+      part = part.strip()
+      if not part:
+        continue
+      if not part.isdigit():
+        raise HTTPException(status_code=400, detail=f"Invalid product id: {part}")
+      product_id = int(part)
+      if product_id not in product_ids:
+        product_ids.append(product_id)
+
+  if not product_ids:
+    raise HTTPException(status_code=400, detail="At least one product id is required")
+  if len(product_ids) > PRODUCT_BATCH_MAX:
+    raise HTTPException(status_code=400, detail=f"Too many product ids (max {PRODUCT_BATCH_MAX})")
+  return product_ids
+
+
+# GET /products/batch — Retrieves many products with category details in one call
+# Serves cached payloads first, then loads the rest with a single IN (...) query and caches them
+# Returns products in request order plus the list of IDs that don't exist
+@router.get("/batch", response_model=ProductBatchOut)
+async def get_products_batch(ids: list[str] = Query(...), db: Session = Depends(get_db)):
+  product_ids = parse_batch_ids(ids)
+
+  payloads = {}
+  for product_id in product_ids:
+    cached = product_cache.get(product_id)
+    if cached is not None:
+      payloads[product_id] = cached
+
+  to_load = [product_id for product_id in product_ids if product_id not in payloads]
+  if to_load:
+    for product_id, payload in (await run_db(db, load_product_payloads, to_load)).items():
+      product_cache.set(product_id, payload)
+      payloads[product_id] = payload
+
+  found = [payloads[product_id] for product_id in product_ids if product_id in payloads]
+  missing = [product_id for product_id in product_ids if product_id not in payloads]
+  body = b'{"products":[' + b",".join(found) + b'],"missing":' + json.dumps(missing).encode() + b"}"
+  return Response(content=body, media_type="application/json")
+
+
+# Loads products by ID with a single IN (...) query and serializes them
+# Returns {product_id: JSON bytes} for the IDs that exist
+def load_product_payloads(db: Session, product_ids: list[int]):
+  products = db.query(Product).options(joinedload(Product.category)).filter(
+    Product.product_id.in_(product_ids)).all()
+  return {product.product_id: serialize_product(product) for product in products}
+
+
+# GET /products/export — Streams the whole catalog (optionally one category) as NDJSON or CSV
+# Rows come from a server-side cursor in batches, so memory stays flat however large the catalog is
+# Returns a downloadable products.ndjson / products.csv with one row per product plus its category name
+@router.get("/export")
+def export_products(
+  format: str = Query("ndjson", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+  category_id: Optional[int] = Query(None)
+):
+  return StreamingResponse(
+    stream_catalog(format, category_id),
+    media_type=EXPORT_FORMATS[format],
+    headers={"Content-Disposition": f'attachment; filename="products.{format}"'}
+  )
 
 
 # GET /products/{product_id} — Retrieves specific product by ID with category details
-# Returns complete product information including associated category
+# Serves the serialized payload from the in-process product cache when present, otherwise loads and caches it
+# ETag is a hash of the payload; a cached product matching If-None-Match gets 304 without a query
 # Raises 404 error if product doesn't exist
 @router.get("/{product_id}", response_model=ProductOut)
-async def get_product(product_id: int, db: Session = Depends(get_db)):
-  product = db.query(Product).options(joinedload(Product.category)).filter(Product.product_id == product_id).first()
-  if not product:
-    raise HTTPException(status_code=404, detail="Product not found")
-  return product
+async def get_product(product_id: int, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+  payload = product_cache.get(product_id)
+  if payload is None:
+    payload = (await run_db(db, load_product_payloads, [product_id])).get(product_id)
+    if payload is None:
+      raise HTTPException(status_code=404, detail="Product not found")
+    product_cache.set(product_id, payload)
+
+  etag = payload_etag(payload)
+  if etag_matches(if_none_match, etag):
+    return not_modified(etag, PRODUCT_CACHE_CONTROL)
+  return Response(
+    content=payload, media_type="application/json",
+    headers={"ETag": etag, "Cache-Control": PRODUCT_CACHE_CONTROL}
+  )
 
 
 # PUT /products/{product_id} — Updates existing product with validation
@@ -106,6 +267,14 @@ async def get_product(product_id: int, db: Session = Depends(get_db)):
 # Returns updated product with category details or raises appropriate errors
 @router.put("/{product_id}", response_model=ProductOut)
 async def update_product(product_id: int, product_update: ProductUpdate, db: Session = Depends(get_db)):
+  updated = await run_db(db, apply_product_update, product_id, product_update)
+  product_cache.invalidate(product_id)
+  catalog_version.bump()
+  return updated
+
+
+# Database half of update_product: validates, applies the changes and commits
+def apply_product_update(db: Session, product_id: int, product_update: ProductUpdate):
   product = db.query(Product).filter(Product.product_id == product_id).first()
   if not product:
     raise HTTPException(status_code=404, detail="Product not found")
@@ -134,7 +303,7 @@ async def update_product(product_id: int, product_update: ProductUpdate, db: Ses
   # Load with category relationship
   product_with_category = db.query(Product).options(joinedload(Product.category)).filter(
     Product.product_id == product_id).first()
-  return product_with_category
+  return ProductOut.model_validate(product_with_category)
 
 
 # DELETE /products/{product_id} — Removes product from database
@@ -142,6 +311,13 @@ async def update_product(product_id: int, product_update: ProductUpdate, db: Ses
 # Returns 204 status on success or 404 if product doesn't exist
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(product_id: int, db: Session = Depends(get_db)):
+  await run_db(db, remove_product, product_id)
+  product_cache.invalidate(product_id)
+  catalog_version.bump()
+
+
+# Database half of delete_product
+def remove_product(db: Session, product_id: int):
   product = db.query(Product).filter(Product.product_id == product_id).first()
   if not product:
     raise HTTPException(status_code=404, detail="Product not found")
@@ -1 +1 @@
-from .product import ProductCreate, ProductOut, ProductUpdate, CategoryCreate, CategoryOut
+from .product import ProductCreate, ProductOut, ProductUpdate, ProductBatchOut, CategoryCreate, CategoryOut
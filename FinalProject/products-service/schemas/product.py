@@ -38,6 +38,10 @@ class ProductOut(ProductBase):
     class Config:
         from_attributes = True
 
+class ProductBatchOut(BaseModel):
+    products: list[ProductOut]
+    missing: list[int]
+
 class CategoryCreate(BaseModel):
     category_name: str = Field(..., max_length=255)
 
@@ -8,10 +8,12 @@ def setup_database():
     from models.database import Base, engine
     from models.products import Product
     from models.categories import Category
+    from helpers.search import ensure_search_index
 
     while True:
         try:
             Base.metadata.create_all(bind=engine)
+            ensure_search_index(engine)
             print("Products service database setup complete")
             break
         except OperationalError:
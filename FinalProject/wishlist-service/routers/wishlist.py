@@ -3,29 +3,22 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from models import get_db, WishlistItem
 from schemas import WishlistItemCreate, WishlistItemOut
+from common.http_client import get_http_client
+from common.catalog_client import get_products_info
+from common.customer_client import validate_customer
+from common.database import run_db
 import httpx
 
 router = APIRouter()
 
 
-async def validate_customer(customer_id: int):
-  """Validate customer exists via customer service"""
-  try:
-    async with httpx.AsyncClient() as client:
-      response = await client.get(f"http://customer-service:8003/customers/{customer_id}")
-      return response.status_code == 200
-  except httpx.RequestError:
-    return False
-
-
 async def get_product_info(product_id: int):
   """Get product information from product service"""
   try:
-    async with httpx.AsyncClient() as client:
-      response = await client.get(f"http://products-service:8005/products/{product_id}")
-      if response.status_code == 200:
-        return response.json()
-      return None
+    response = await get_http_client().get(f"http://products-service:8005/products/{product_id}")
+    if response.status_code == 200:
+      return response.json()
+    return None
   except httpx.RequestError:
     return None
 
@@ -41,6 +34,14 @@ async def add_to_wishlist(item_data: WishlistItemCreate, db: Session = Depends(g
   if not product_info:
     raise HTTPException(status_code=400, detail="Product not found")
 
+  # Insert the row, then add product info to response
+  result = await run_db(db, insert_wishlist_item, item_data)
+  result.product = product_info
+  return result
+
+
+def insert_wishlist_item(db: Session, item_data: WishlistItemCreate):
+  """Insert a wishlist row, rejecting duplicates"""
   # Check if item already exists
   existing_item = db.query(WishlistItem).filter(
     WishlistItem.customer_id == item_data.customer_id,
@@ -60,12 +61,7 @@ async def add_to_wishlist(item_data: WishlistItemCreate, db: Session = Depends(g
     db.add(wishlist_item)
     db.commit()
     db.refresh(wishlist_item)
-
-    # Add product info to response
-    result = WishlistItemOut.from_orm(wishlist_item)
-    result.product = product_info
-
-    return result
+    return WishlistItemOut.from_orm(wishlist_item)
   except IntegrityError:
     db.rollback()
     raise HTTPException(status_code=400, detail="Item already in wishlist")
@@ -77,28 +73,36 @@ async def get_customer_wishlist(customer_id: int, db: Session = Depends(get_db))
   if not await validate_customer(customer_id):
     raise HTTPException(status_code=404, detail="Customer not found")
 
+  wishlist_items = await run_db(db, list_wishlist_items, customer_id)
+
+  # Get product information for every item in one batched fetch
+  # Items whose product is gone (or products-service is down) are returned without product info
+  products = await get_products_info(item_out.product_id for item_out in wishlist_items) or {}
+  for item_out in wishlist_items:
+    item_out.product = products.get(item_out.product_id)
+
+  return wishlist_items
+
+
+def list_wishlist_items(db: Session, customer_id: int):
+  """Load a customer's wishlist rows"""
   wishlist_items = db.query(WishlistItem).filter(
     WishlistItem.customer_id == customer_id
   ).all()
-
-  # Get product information for each item
-  result = []
-  for item in wishlist_items:
-    product_info = await get_product_info(item.product_id)
-    item_out = WishlistItemOut.from_orm(item)
-    if product_info:
-      item_out.product = product_info
-    result.append(item_out)
-
-  return result
+  return [WishlistItemOut.from_orm(item) for item in wishlist_items]
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_from_wishlist(item_id: int, db: Session = Depends(get_db)):
-  item = db.query(WishlistItem).filter(WishlistItem.id == item_id).first()
+  await run_db(db, delete_wishlist_row, WishlistItem.id == item_id, "Wishlist item not found")
+
+
+def delete_wishlist_row(db: Session, criteria, not_found_detail: str):
+  """Delete the single wishlist row matching criteria, 404 if there is none"""
+  item = db.query(WishlistItem).filter(criteria).first()
 
   if not item:
-    raise HTTPException(status_code=404, detail="Wishlist item not found")
+    raise HTTPException(status_code=404, detail=not_found_detail)
 
   db.delete(item)
   db.commit()
@@ -106,16 +110,11 @@ async def remove_from_wishlist(item_id: int, db: Session = Depends(get_db)):
 
 @router.delete("/customer/{customer_id}/product/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_from_wishlist_by_product(customer_id: int, product_id: int, db: Session = Depends(get_db)):
-  item = db.query(WishlistItem).filter(
-    WishlistItem.customer_id == customer_id,
-    WishlistItem.product_id == product_id
-  ).first()
-
-  if not item:
-    raise HTTPException(status_code=404, detail="Item not found in wishlist")
-
-  db.delete(item)
-  db.commit()
+  await run_db(
+    db, delete_wishlist_row,
+    (WishlistItem.customer_id == customer_id) & (WishlistItem.product_id == product_id),
+    "Item not found in wishlist"
+  )
 
 
 @router.delete("/customer/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -124,11 +123,18 @@ async def clear_customer_wishlist(customer_id: int, db: Session = Depends(get_db
   if not await validate_customer(customer_id):
     raise HTTPException(status_code=404, detail="Customer not found")
 
+  await run_db(db, clear_wishlist_rows, customer_id)
+
+
+def clear_wishlist_rows(db: Session, customer_id: int):
+  """Delete every wishlist row for a customer"""
   db.query(WishlistItem).filter(WishlistItem.customer_id == customer_id).delete()
   db.commit()
 
 
 @router.get("/customer/{customer_id}/count")
 async def get_wishlist_count(customer_id: int, db: Session = Depends(get_db)):
-  count = db.query(WishlistItem).filter(WishlistItem.customer_id == customer_id).count()
+  count = await run_db(
+    db, lambda db: db.query(WishlistItem).filter(WishlistItem.customer_id == customer_id).count()
+  )
   return {"count": count}